@@ -20,7 +20,7 @@ if config.config_file_name is not None:
 # target_metadata = mymodel.Base.metadata
 
 from app.core.db import Base
-from app.models import post, user, rating, transaction
+import app.models  # noqa: F401  (registers every table on Base.metadata)
 
 
 target_metadata = Base.metadata
@@ -0,0 +1,32 @@
+"""post feed indexes
+
+Revision ID: 3c9f1b7d2e4a
+Revises: a5e72ae7bac1
+Create Date: 2026-02-21 11:02:43.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c9f1b7d2e4a'
+down_revision: Union[str, Sequence[str], None] = 'a5e72ae7bac1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_posts_created_id', 'posts', [sa.text('created_at DESC'), sa.text('id DESC')])
+    op.create_index('ix_posts_status_created_id', 'posts', ['status', sa.text('created_at DESC'), sa.text('id DESC')])
+    op.create_index('ix_posts_seller_created_id', 'posts', ['seller_id', sa.text('created_at DESC'), sa.text('id DESC')])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_posts_seller_created_id', table_name='posts')
+    op.drop_index('ix_posts_status_created_id', table_name='posts')
+    op.drop_index('ix_posts_created_id', table_name='posts')
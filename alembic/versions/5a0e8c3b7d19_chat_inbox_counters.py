@@ -0,0 +1,68 @@
+"""chat inbox counters
+
+Revision ID: 5a0e8c3b7d19
+Revises: d4f7a2e9c613
+Create Date: 2026-03-01 13:08:27.441902
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5a0e8c3b7d19'
+down_revision: Union[str, Sequence[str], None] = 'd4f7a2e9c613'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # app startup's create_all() may have made these already
+    inspector = sa.inspect(op.get_bind())
+    conversation_columns = {c['name'] for c in inspector.get_columns('conversations')}
+    if 'last_message_id' not in conversation_columns:
+        op.add_column('conversations', sa.Column('last_message_id', sa.BigInteger(), nullable=True))
+    if 'last_message_at' not in conversation_columns:
+        op.add_column('conversations', sa.Column('last_message_at', sa.DateTime(timezone=True), nullable=True))
+    if 'unread_count' not in {c['name'] for c in inspector.get_columns('conversation_reads')}:
+        op.add_column('conversation_reads', sa.Column('unread_count', sa.Integer(), server_default='0', nullable=False))
+    if 'ix_conversation_reads_user' not in {i['name'] for i in inspector.get_indexes('conversation_reads')}:
+        op.create_index('ix_conversation_reads_user', 'conversation_reads', ['user_id'])
+
+    # backfill (same as `python -m app.services.chat_counters`)
+    op.execute("""
+        UPDATE conversations c
+        SET last_message_id = m.id, last_message_at = m.created_at
+        FROM (
+            SELECT DISTINCT ON (conversation_id) conversation_id, id, created_at
+            FROM messages
+            ORDER BY conversation_id, id DESC
+        ) m
+        WHERE m.conversation_id = c.id
+    """)
+    op.execute("""
+        INSERT INTO conversation_reads (conversation_id, user_id, unread_count)
+        SELECT c.id, p.user_id, count(m.id)
+        FROM conversations c
+        CROSS JOIN LATERAL (VALUES (c.buyer_id), (c.seller_id)) AS p(user_id)
+        LEFT JOIN conversation_reads r
+          ON r.conversation_id = c.id AND r.user_id = p.user_id
+        LEFT JOIN messages m
+          ON m.conversation_id = c.id
+         AND m.sender_id <> p.user_id
+         AND m.id > coalesce(r.last_read_message_id, 0)
+        GROUP BY c.id, p.user_id
+        ON CONFLICT (conversation_id, user_id)
+        DO UPDATE SET unread_count = EXCLUDED.unread_count
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_conversation_reads_user', table_name='conversation_reads')
+    op.drop_column('conversation_reads', 'unread_count')
+    op.drop_column('conversations', 'last_message_at')
+    op.drop_column('conversations', 'last_message_id')
@@ -0,0 +1,42 @@
+"""post location and user campus
+
+Revision ID: 7e2a4c81f0b5
+Revises: 3c9f1b7d2e4a
+Create Date: 2026-02-22 15:47:09.530127
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7e2a4c81f0b5'
+down_revision: Union[str, Sequence[str], None] = '3c9f1b7d2e4a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('posts', sa.Column('lat', sa.Float(), nullable=True))
+    op.add_column('posts', sa.Column('lng', sa.Float(), nullable=True))
+    op.add_column('posts', sa.Column('geo_cell', sa.BigInteger(), nullable=True))
+    op.create_index('ix_posts_geo_cell', 'posts', ['geo_cell'])
+
+    op.add_column('users', sa.Column('campus_lat', sa.Float(), nullable=True))
+    op.add_column('users', sa.Column('campus_lng', sa.Float(), nullable=True))
+    op.add_column('users', sa.Column('default_radius_km', sa.Float(), server_default='10', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('users', 'default_radius_km')
+    op.drop_column('users', 'campus_lng')
+    op.drop_column('users', 'campus_lat')
+
+    op.drop_index('ix_posts_geo_cell', table_name='posts')
+    op.drop_column('posts', 'geo_cell')
+    op.drop_column('posts', 'lng')
+    op.drop_column('posts', 'lat')
@@ -0,0 +1,57 @@
+"""post change feed
+
+Revision ID: 9b4e2d7c1a53
+Revises: c7d3e81f5a26
+Create Date: 2026-03-01 16:40:05.117392
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.models.post import POST_CHANGE_DDL
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b4e2d7c1a53'
+down_revision: Union[str, Sequence[str], None] = 'c7d3e81f5a26'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # app startup's create_all() may have made post_tombstones already (but
+    # never adds columns to posts)
+    inspector = sa.inspect(op.get_bind())
+
+    if 'change_seq' not in {c['name'] for c in inspector.get_columns('posts')}:
+        # existing rows all get this migration's transaction id
+        op.add_column('posts', sa.Column('change_seq', sa.BigInteger(), server_default=sa.text('pg_current_xact_id()::text::bigint'), nullable=False))
+    if 'ix_posts_change_seq_id' not in {i['name'] for i in inspector.get_indexes('posts')}:
+        op.create_index('ix_posts_change_seq_id', 'posts', ['change_seq', 'id'])
+    if 'post_tombstones' not in inspector.get_table_names():
+        op.create_table('post_tombstones',
+        sa.Column('post_id', sa.BigInteger(), nullable=False),
+        sa.Column('change_seq', sa.BigInteger(), nullable=False),
+        sa.Column('deleted_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('post_id')
+        )
+        op.create_index('ix_post_tombstones_change_seq_id', 'post_tombstones', ['change_seq', 'post_id'])
+
+    # functions and triggers; every statement is safe to re-run
+    for sql in POST_CHANGE_DDL:
+        op.execute(sql)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS trg_posts_tombstone ON posts")
+    op.execute("DROP TRIGGER IF EXISTS trg_posts_change_seq ON posts")
+    op.execute("DROP FUNCTION IF EXISTS posts_tombstone()")
+    op.execute("DROP FUNCTION IF EXISTS posts_change_seq()")
+    op.drop_index('ix_post_tombstones_change_seq_id', table_name='post_tombstones')
+    op.drop_table('post_tombstones')
+    op.drop_index('ix_posts_change_seq_id', table_name='posts')
+    op.drop_column('posts', 'change_seq')
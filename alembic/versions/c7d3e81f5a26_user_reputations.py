@@ -0,0 +1,80 @@
+"""user reputations
+
+Revision ID: c7d3e81f5a26
+Revises: e3c5b9a1f742
+Create Date: 2026-03-01 15:12:44.318205
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7d3e81f5a26'
+down_revision: Union[str, Sequence[str], None] = 'e3c5b9a1f742'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # app startup's create_all() may have made user_reputations already
+    inspector = sa.inspect(op.get_bind())
+    existing = inspector.get_table_names()
+
+    if 'created_at' not in {c['name'] for c in inspector.get_columns('ratings')}:
+        op.add_column('ratings', sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False))
+    if 'user_reputations' not in existing:
+        op.create_table('user_reputations',
+        sa.Column('user_id', sa.BigInteger(), nullable=False),
+        sa.Column('rating_count', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('star_sum', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('stars_1', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('stars_2', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('stars_3', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('stars_4', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('stars_5', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('last_rated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id')
+        )
+
+    # one rating per side of a transaction. Keep the first of any duplicates
+    # so they stop counting towards the ratee's reputation; setup.sql used to
+    # allow only one rating per transaction, which blocked the second side
+    op.execute("""
+        DELETE FROM ratings r
+        USING ratings older
+        WHERE older.transaction_id = r.transaction_id
+          AND older.rater_id = r.rater_id
+          AND older.id < r.id
+    """)
+    op.execute("ALTER TABLE ratings DROP CONSTRAINT IF EXISTS ratings_transaction_id_key")
+    if 'uq_ratings_transaction_rater' not in {c['name'] for c in inspector.get_unique_constraints('ratings')}:
+        op.create_unique_constraint('uq_ratings_transaction_rater', 'ratings', ['transaction_id', 'rater_id'])
+
+    # backfill (same as `python -m app.services.reputation`)
+    op.execute("""
+        INSERT INTO user_reputations
+            (user_id, rating_count, star_sum, stars_1, stars_2, stars_3, stars_4, stars_5, last_rated_at)
+        SELECT ratee_id, count(*), sum(stars),
+               count(*) FILTER (WHERE stars = 1), count(*) FILTER (WHERE stars = 2),
+               count(*) FILTER (WHERE stars = 3), count(*) FILTER (WHERE stars = 4),
+               count(*) FILTER (WHERE stars = 5),
+               max(created_at)
+        FROM ratings
+        GROUP BY ratee_id
+        ON CONFLICT (user_id) DO UPDATE SET
+            rating_count = EXCLUDED.rating_count, star_sum = EXCLUDED.star_sum,
+            stars_1 = EXCLUDED.stars_1, stars_2 = EXCLUDED.stars_2, stars_3 = EXCLUDED.stars_3,
+            stars_4 = EXCLUDED.stars_4, stars_5 = EXCLUDED.stars_5, last_rated_at = EXCLUDED.last_rated_at
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('user_reputations')
+    op.drop_constraint('uq_ratings_transaction_rater', 'ratings', type_='unique')
+    op.drop_column('ratings', 'created_at')
@@ -0,0 +1,65 @@
+"""saved searches and notifications
+
+Revision ID: d41f6a2b8e07
+Revises: 9b4e2d7c1a53
+Create Date: 2026-03-01 17:25:31.604418
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd41f6a2b8e07'
+down_revision: Union[str, Sequence[str], None] = '9b4e2d7c1a53'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # app startup's create_all() may have made these already
+    existing = sa.inspect(op.get_bind()).get_table_names()
+
+    if 'saved_searches' not in existing:
+        op.create_table('saved_searches',
+        sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column('user_id', sa.BigInteger(), nullable=False),
+        sa.Column('name', sa.String(length=80), nullable=True),
+        sa.Column('keywords', sa.String(length=200), nullable=True),
+        sa.Column('min_price_cents', sa.Integer(), nullable=True),
+        sa.Column('max_price_cents', sa.Integer(), nullable=True),
+        sa.Column('lat', sa.Float(), nullable=True),
+        sa.Column('lng', sa.Float(), nullable=True),
+        sa.Column('radius_km', sa.Float(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('ix_saved_searches_user', 'saved_searches', ['user_id'])
+
+    if 'notifications' not in existing:
+        op.create_table('notifications',
+        sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column('user_id', sa.BigInteger(), nullable=False),
+        sa.Column('saved_search_id', sa.BigInteger(), nullable=False),
+        sa.Column('post_id', sa.BigInteger(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('read_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['saved_search_id'], ['saved_searches.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['post_id'], ['posts.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('saved_search_id', 'post_id')
+        )
+        op.create_index('ix_notifications_user_id', 'notifications', ['user_id', sa.text('id DESC')])
+        op.create_index('ix_notifications_user_unread', 'notifications', ['user_id'],
+                        postgresql_where=sa.text('read_at IS NULL'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('notifications')
+    op.drop_table('saved_searches')
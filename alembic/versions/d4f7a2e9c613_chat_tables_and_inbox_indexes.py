@@ -0,0 +1,79 @@
+"""chat tables and inbox indexes
+
+Revision ID: d4f7a2e9c613
+Revises: b81d0f6a93c2
+Create Date: 2026-02-27 20:31:18.877410
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4f7a2e9c613'
+down_revision: Union[str, Sequence[str], None] = 'b81d0f6a93c2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # chat tables were only ever created by create_all() at app startup
+    inspector = sa.inspect(op.get_bind())
+    existing = inspector.get_table_names()
+
+    if 'conversations' not in existing:
+        op.create_table('conversations',
+        sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column('post_id', sa.BigInteger(), nullable=False),
+        sa.Column('buyer_id', sa.BigInteger(), nullable=False),
+        sa.Column('seller_id', sa.BigInteger(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['post_id'], ['posts.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['buyer_id'], ['users.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['seller_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('post_id', 'buyer_id', 'seller_id', name='uq_conversation_thread')
+        )
+    if 'messages' not in existing:
+        op.create_table('messages',
+        sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column('conversation_id', sa.BigInteger(), nullable=False),
+        sa.Column('sender_id', sa.BigInteger(), nullable=False),
+        sa.Column('body', sa.Text(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['conversation_id'], ['conversations.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['sender_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('ix_messages_conversation_created', 'messages', ['conversation_id', 'created_at'])
+    if 'conversation_reads' not in existing:
+        op.create_table('conversation_reads',
+        sa.Column('conversation_id', sa.BigInteger(), nullable=False),
+        sa.Column('user_id', sa.BigInteger(), nullable=False),
+        sa.Column('last_read_message_id', sa.BigInteger(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['conversation_id'], ['conversations.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('conversation_id', 'user_id')
+        )
+
+    # so might these, if create_all() ran against the current models
+    message_indexes = {i['name'] for i in inspector.get_indexes('messages')}
+    conversation_indexes = {i['name'] for i in inspector.get_indexes('conversations')}
+    if 'ix_messages_conversation_id' not in message_indexes:
+        op.create_index('ix_messages_conversation_id', 'messages', ['conversation_id', 'id'])
+    if 'ix_conversations_buyer_updated' not in conversation_indexes:
+        op.create_index('ix_conversations_buyer_updated', 'conversations', ['buyer_id', sa.text('updated_at DESC'), sa.text('id DESC')])
+    if 'ix_conversations_seller_updated' not in conversation_indexes:
+        op.create_index('ix_conversations_seller_updated', 'conversations', ['seller_id', sa.text('updated_at DESC'), sa.text('id DESC')])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_conversations_seller_updated', table_name='conversations')
+    op.drop_index('ix_conversations_buyer_updated', table_name='conversations')
+    op.drop_index('ix_messages_conversation_id', table_name='messages')
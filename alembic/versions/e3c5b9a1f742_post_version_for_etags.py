@@ -0,0 +1,30 @@
+"""post updated_at and version for etags
+
+Revision ID: e3c5b9a1f742
+Revises: 5a0e8c3b7d19
+Create Date: 2026-03-01 15:41:06.218734
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3c5b9a1f742'
+down_revision: Union[str, Sequence[str], None] = '5a0e8c3b7d19'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('posts', sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False))
+    op.add_column('posts', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('posts', 'version')
+    op.drop_column('posts', 'updated_at')
@@ -3,8 +3,11 @@ from fastapi import Depends, HTTPException, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
+from app.core.cache import TTLCache
+from app.core.config import settings
 from app.core.db import get_db
-from app.core.security import decode_access_token
+from app.core.events import bus
+from app.core.security import create_access_token, decode_access_claims
 from app.models.user import User
 
 COOKIE_NAME = "access_token"
@@ -15,26 +18,58 @@ class CurrentUser:
     email: str
     name: str
 
-async def get_current_user(
-    request: Request,
-    db: AsyncSession = Depends(get_db),
-) -> CurrentUser | None:
-    token = request.cookies.get(COOKIE_NAME)
+user_cache = TTLCache(settings.AUTH_USER_CACHE_SIZE, settings.AUTH_USER_CACHE_TTL_SECONDS)
+
+def issue_token(user: User) -> str:
+    claims = {"email": user.email, "name": user.name} if settings.AUTH_TOKEN_CLAIMS else None
+    return create_access_token(user.id, claims)
+
+def invalidate_user(user_id: int):
+    user_cache.pop(user_id)
+
+async def load_current_user(db: AsyncSession, token: str | None) -> CurrentUser | None:
     if not token:
         return None
 
-    user_id = decode_access_token(token)
-    if not user_id:
+    claims = decode_access_claims(token)
+    if not claims:
         return None
+    user_id = claims["sub"]
+
+    # signed claims are trusted as-is
+    if settings.AUTH_TOKEN_CLAIMS and "email" in claims and "name" in claims:
+        return CurrentUser(id=user_id, email=claims["email"], name=claims["name"])
+
+    cached = user_cache.get(user_id)
+    if cached:
+        return cached
 
     result = await db.execute(select(User).where(User.id == user_id))
     user = result.scalar_one_or_none()
     if not user:
         return None
 
-    return CurrentUser(id=user.id, email=user.email, name=user.name)
+    current = CurrentUser(id=user.id, email=user.email, name=user.name)
+    user_cache.set(user.id, current)
+    return current
+
+async def get_current_user(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+) -> CurrentUser | None:
+    return await load_current_user(db, request.cookies.get(COOKIE_NAME))
 
 def require_user(user: CurrentUser | None = Depends(get_current_user)) -> CurrentUser:
     if not user:
         raise HTTPException(status_code=401, detail="Not authenticated")
     return user
+
+async def _on_user_events(events: list[dict]):
+    for e in events:
+        invalidate_user(e["user_id"])
+
+async def _on_bus_reconnect(events: list[dict]):
+    user_cache.clear()
+
+bus.subscribe("user.", _on_user_events)
+bus.subscribe("bus.reconnected", _on_bus_reconnect)
@@ -7,5 +7,70 @@ class Settings(BaseSettings):
     DATABASE_URL: str
     FRONTEND_ORIGIN: str = "http://localhost:3000"
 
+    # engine / pool profile (defaults suit one uvicorn worker against a local Postgres)
+    DB_ECHO: bool = False
+    DB_LOG_LEVEL: str = "WARNING"
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_CACHE_SIZE: int = 100
+
+    # optional read replicas (comma-separated URLs). Routes that depend on
+    # get_read_db go to them round-robin while they pass health checks; a
+    # client that wrote within DB_PRIMARY_PIN_SECONDS keeps reading the primary
+    DATABASE_REPLICA_URLS: str = ""
+    DB_REPLICA_HEALTH_INTERVAL_SECONDS: float = 5.0
+    DB_REPLICA_MAX_LAG_SECONDS: float = 10.0
+    DB_PRIMARY_PIN_SECONDS: float = 5.0
+
+    # chat websocket: per-connection outbox size and idle ping interval
+    CHAT_WS_QUEUE_SIZE: int = 256
+    CHAT_WS_HEARTBEAT_SECONDS: float = 25.0
+
+    # GET /posts and /posts/{id}: serialized bodies cached in-process (size 0
+    # disables) and the max-age clients may reuse a response before revalidating
+    POST_CACHE_SIZE: int = 5000
+    POST_LIST_CACHE_SIZE: int = 500
+    POST_CACHE_TTL_SECONDS: float = 30.0
+    POST_HTTP_MAX_AGE_SECONDS: int = 0
+
+    # opt-in group commit for POST .../messages: concurrent sends are collected
+    # for up to the window and written with one INSERT and one commit
+    CHAT_GROUP_COMMIT: bool = False
+    CHAT_GROUP_COMMIT_WINDOW_MS: float = 2.0
+    CHAT_GROUP_COMMIT_MAX_BATCH: int = 256
+
+    # GET /posts/suggest: at most this many distinct title words are kept in
+    # memory (the most used ones at load time); words first seen once it is
+    # full are left out until the next restart
+    SUGGEST_MAX_TERMS: int = 50000
+
+    # requests slower than this are logged with the SQL they ran
+    SLOW_REQUEST_MS: float = 500.0
+
+    # get_current_user: cache of CurrentUser by id (size 0 disables), and
+    # optionally carry email/name in the JWT so no lookup is needed at all
+    AUTH_USER_CACHE_SIZE: int = 10000
+    AUTH_USER_CACHE_TTL_SECONDS: float = 60.0
+    AUTH_TOKEN_CLAIMS: bool = False
+
+    # bcrypt runs on a dedicated thread pool; callers wait at most the queue
+    # timeout for a slot before getting a 503
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_CONCURRENCY: int = 4
+    PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS: float = 5.0
+
+    # cross-worker events: "postgres" (LISTEN/NOTIFY) or "memory" (single process)
+    EVENT_BUS_BACKEND: str = "memory"
+    EVENT_BUS_CHANNEL: str = "app_events"
+    EVENT_BUS_COALESCE_MS: float = 5.0
+
+    @property
+    def cors_origins(self) -> list[str]:
+        # also what /chat/ws checks a handshake's Origin against
+        return [self.FRONTEND_ORIGIN]
+
 
 settings = Settings()
@@ -1,10 +1,166 @@
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+import asyncio
+import logging
+import math
+import time
+
+from fastapi import Depends, Request
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from app.core.config import settings
 
-engine = create_async_engine(settings.DATABASE_URL, echo=True)
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that also records how long checkouts take (queueing for a free
+    connection, or opening a new one when under size + overflow)."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_count = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            waited = time.perf_counter() - start
+            self.wait_count += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+
+
+def make_engine(url: str) -> AsyncEngine:
+    url = make_url(url)
+    if url.drivername == "postgresql+asyncpg":
+        url = url.update_query_dict({"prepared_statement_cache_size": str(settings.DB_STATEMENT_CACHE_SIZE)})
+
+    return create_async_engine(
+        url,
+        echo=settings.DB_ECHO,
+        poolclass=TimedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+    )
+
+
+def pool_stats(engine: AsyncEngine) -> dict:
+    pool = engine.pool
+    out = {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+    }
+    if isinstance(pool, TimedQueuePool):
+        out.update(
+            checkouts=pool.wait_count,
+            wait_ms_avg=round(pool.wait_total / pool.wait_count * 1000, 3) if pool.wait_count else 0.0,
+            wait_ms_max=round(pool.wait_max * 1000, 3),
+        )
+    return out
+
+
+if not settings.DB_ECHO:
+    logging.getLogger("sqlalchemy.engine").setLevel(settings.DB_LOG_LEVEL)
+
+engine = make_engine(settings.DATABASE_URL)
 SessionLocal = async_sessionmaker(engine, expire_on_commit=False)
 
+log = logging.getLogger(__name__)
+
+# seconds a replica is behind; 0 on a primary, and on a replica that has
+# replayed everything it received (an idle primary sends nothing new, so
+# the last replay timestamp alone would look like growing lag)
+REPLICA_LAG_SQL = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE coalesce(extract(epoch FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+
+class ReplicaSet:
+    """Read replicas handed out round-robin, skipping any that failed their
+    last health check (unreachable, or lagging more than max_lag_seconds)."""
+
+    def __init__(self, urls: list[str], interval_seconds: float, max_lag_seconds: float):
+        self.urls = urls
+        self.engines = [make_engine(u) for u in urls]
+        self.healthy = [True] * len(urls)
+        self.lag: list[float | None] = [None] * len(urls)
+        self.interval = interval_seconds
+        self.max_lag = max_lag_seconds
+        self._next = 0
+        self._task: asyncio.Task | None = None
+
+    def pick(self) -> AsyncEngine | None:
+        for _ in range(len(self.engines)):
+            i = self._next % len(self.engines)
+            self._next += 1
+            if self.healthy[i]:
+                return self.engines[i]
+        return None
+
+    async def _check(self, i: int):
+        try:
+            async with asyncio.timeout(self.interval):
+                async with self.engines[i].connect() as conn:
+                    lag = float((await conn.execute(REPLICA_LAG_SQL)).scalar_one())
+        except Exception as e:
+            lag, ok = None, False
+            reason = f"{type(e).__name__}: {e}"
+        else:
+            ok = lag <= self.max_lag
+            reason = f"{lag:.1f}s behind"
+        if ok != self.healthy[i]:
+            log.warning("replica %s %s (%s)", make_url(self.urls[i]).render_as_string(), "back in rotation" if ok else "out of rotation", reason)
+        self.healthy[i], self.lag[i] = ok, lag
+
+    async def check(self):
+        await asyncio.gather(*(self._check(i) for i in range(len(self.engines))))
+
+    async def _run(self):
+        while True:
+            await self.check()
+            await asyncio.sleep(self.interval)
+
+    async def start(self):
+        if self.engines:
+            await self.check()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for e in self.engines:
+            await e.dispose()
+
+    def stats(self) -> list[dict]:
+        return [
+            {"url": make_url(u).render_as_string(), "healthy": ok, "lag_seconds": lag, "pool": pool_stats(e)}
+            for u, e, ok, lag in zip(self.urls, self.engines, self.healthy, self.lag)
+        ]
+
+
+replicas = ReplicaSet(
+    [u.strip() for u in settings.DATABASE_REPLICA_URLS.split(",") if u.strip()],
+    settings.DB_REPLICA_HEALTH_INTERVAL_SECONDS,
+    settings.DB_REPLICA_MAX_LAG_SECONDS,
+)
+
 
 class Base(DeclarativeBase):
     pass
@@ -13,3 +169,52 @@ class Base(DeclarativeBase):
 async def get_db() -> AsyncSession:
     async with SessionLocal() as session:
         yield session
+
+
+PIN_COOKIE = "db_primary"
+
+
+def read_engine(request: Request) -> AsyncEngine | None:
+    """A healthy replica to serve this request's reads, or None for the
+    primary: there are none, or the client wrote recently (see
+    PrimaryPinMiddleware) and must see its own writes."""
+    if PIN_COOKIE in request.cookies:
+        return None
+    return replicas.pick()
+
+
+async def get_read_db(request: Request, db: AsyncSession = Depends(get_db)) -> AsyncSession:
+    """get_db for read-only routes, routed by read_engine()."""
+    replica = read_engine(request)
+    if replica is None:
+        yield db
+        return
+    async with SessionLocal(bind=replica) as session:
+        yield session
+
+
+def on_replica(db: AsyncSession) -> bool:
+    return db.bind is not engine
+
+
+class PrimaryPinMiddleware:
+    """Marks clients that just wrote (a successful non-GET request) with a
+    short-lived cookie so get_read_db keeps them on the primary until
+    replicas have caught up with their write."""
+
+    SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+    def __init__(self, app, pin_seconds: float):
+        self.app = app
+        self.cookie = f"{PIN_COOKIE}=1; Max-Age={math.ceil(pin_seconds)}; Path=/; HttpOnly; SameSite=lax".encode()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] in self.SAFE_METHODS:
+            return await self.app(scope, receive, send)
+
+        async def pin(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                message["headers"] = [*message.get("headers", []), (b"set-cookie", self.cookie)]
+            await send(message)
+
+        await self.app(scope, receive, pin)
@@ -0,0 +1,220 @@
+"""Cross-worker pub/sub for small JSON events ("message.created", "post.updated", ...).
+
+Writers call queue_event(session, {...}) before committing; the events go out
+only if that transaction commits. Every worker's subscribers then receive them,
+batched, via Postgres LISTEN/NOTIFY (EVENT_BUS_BACKEND=postgres) or directly in
+this process (EVENT_BUS_BACKEND=memory, single worker / tests).
+"""
+import asyncio
+import json
+import logging
+
+import asyncpg
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+
+log = logging.getLogger(__name__)
+
+# NOTIFY payloads must stay under 8000 bytes
+MAX_PAYLOAD_BYTES = 7800
+RECONNECTED = {"type": "bus.reconnected"}
+
+
+def _spawn(tasks: set, coro):
+    # the loop only keeps weak references to tasks; hold one until it finishes
+    task = asyncio.get_running_loop().create_task(coro)
+    tasks.add(task)
+    task.add_done_callback(tasks.discard)
+
+
+class MemoryBackend:
+    async def start(self, bus: "EventBus"):
+        self.bus = bus
+        self._tasks: set[asyncio.Task] = set()
+
+    async def stop(self):
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def send(self, payloads: list[str]):
+        # deliver like NOTIFY does: a slow handler must not hold up the flusher
+        for payload in payloads:
+            _spawn(self._tasks, self.bus.dispatch(json.loads(payload)))
+
+
+class PostgresBackend:
+    def __init__(self, dsn: str, channel: str):
+        self.dsn = dsn
+        self.channel = channel
+        self._conn: asyncpg.Connection | None = None
+        self._connected = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+    async def start(self, bus: "EventBus"):
+        self.bus = bus
+        self._task = asyncio.create_task(self._listen_loop())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._conn and not self._conn.is_closed():
+            await self._conn.close()
+
+    async def send(self, payloads: list[str]):
+        while True:
+            await self._connected.wait()
+            try:
+                for payload in payloads:
+                    await self._conn.execute("SELECT pg_notify($1, $2)", self.channel, payload)
+                return
+            except (asyncpg.PostgresConnectionError, asyncpg.InterfaceError, OSError):
+                self._connected.clear()  # listener loop reconnects; retry then
+
+    def _on_notify(self, conn, pid, channel, payload):
+        _spawn(self._tasks, self.bus.dispatch(json.loads(payload)))
+
+    async def _listen_loop(self):
+        delay = 0.5
+        first = True
+        while True:
+            lost = asyncio.Event()
+            try:
+                self._conn = await asyncpg.connect(self.dsn)
+                self._conn.add_termination_listener(lambda _conn: lost.set())
+                await self._conn.add_listener(self.channel, self._on_notify)
+            except (OSError, asyncpg.PostgresError, asyncpg.InterfaceError):
+                log.warning("event bus: connect failed, retrying in %.1fs", delay)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30)
+                continue
+
+            delay = 0.5
+            self._connected.set()
+            if not first:
+                # anything published while we were away is lost; let caches start over
+                await self.bus.dispatch([RECONNECTED])
+            first = False
+
+            await lost.wait()
+            self._connected.clear()
+            log.warning("event bus: connection lost, reconnecting")
+
+
+class EventBus:
+    def __init__(self, backend, coalesce_ms: float):
+        self.backend = backend
+        self.coalesce_seconds = coalesce_ms / 1000
+        self._handlers: list[tuple[str, object]] = []
+        self._outbox: asyncio.Queue[dict] | None = None
+        self._flusher: asyncio.Task | None = None
+
+    def subscribe(self, prefix: str, handler):
+        """handler(events: list[dict]) is awaited with every delivered batch's events whose type starts with prefix."""
+        self._handlers.append((prefix, handler))
+
+    def publish(self, evt: dict):
+        if self._outbox is None:
+            return  # bus not started (scripts, migrations)
+        self._outbox.put_nowait(evt)
+
+    async def start(self):
+        self._outbox = asyncio.Queue()
+        await self.backend.start(self)
+        self._flusher = asyncio.create_task(self._flush_loop())
+
+    async def stop(self):
+        if self._flusher:
+            self._flusher.cancel()
+            await asyncio.gather(self._flusher, return_exceptions=True)
+        await self.backend.stop()
+        self._outbox = None
+
+    async def dispatch(self, events: list[dict]):
+        for prefix, handler in self._handlers:
+            matching = [e for e in events if e.get("type", "").startswith(prefix)]
+            if not matching:
+                continue
+            try:
+                await handler(matching)
+            except Exception:
+                log.exception("event bus: handler %r failed", handler)
+
+    async def _flush_loop(self):
+        while True:
+            batch = [await self._outbox.get()]
+            # let a burst accumulate, then ship it as few notifications as possible
+            await asyncio.sleep(self.coalesce_seconds)
+            while not self._outbox.empty():
+                batch.append(self._outbox.get_nowait())
+            try:
+                await self.backend.send(_pack(batch))
+            except Exception:
+                log.exception("event bus: dropped %d events", len(batch))
+
+
+def _pack(batch: list[dict]) -> list[str]:
+    """Drop duplicate events and split the rest into JSON-array payloads under the NOTIFY limit."""
+    unique = list(dict.fromkeys(json.dumps(e, sort_keys=True, separators=(",", ":"), default=str) for e in batch))
+    payloads, chunk, size = [], [], 2
+    for item in unique:
+        if chunk and size + len(item) + 1 > MAX_PAYLOAD_BYTES:
+            payloads.append("[" + ",".join(chunk) + "]")
+            chunk, size = [], 2
+        chunk.append(item)
+        size += len(item) + 1
+    if chunk:
+        payloads.append("[" + ",".join(chunk) + "]")
+    return payloads
+
+
+def queue_event(db, evt: dict):
+    """Publish evt once the session's current transaction commits (dropped on
+    rollback, or when a savepoint it was queued in rolls back)."""
+    db.info.setdefault("pending_events", []).append(evt)
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_pending(session):
+    session.info.pop("savepoint_marks", None)
+    for evt in session.info.pop("pending_events", ()):
+        bus.publish(evt)
+
+
+@event.listens_for(Session, "after_transaction_create")
+def _mark_savepoint(session, transaction):
+    if transaction.nested:
+        marks = session.info.setdefault("savepoint_marks", {})
+        marks[transaction] = len(session.info.get("pending_events", ()))
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _drop_savepoint_events(session, previous_transaction):
+    # after_rollback also fires for savepoints, so it can't tell these apart
+    # from the whole transaction going away; the root is handled below
+    mark = session.info.get("savepoint_marks", {}).pop(previous_transaction, None)
+    if mark is not None:
+        del session.info.get("pending_events", [])[mark:]
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _drop_pending(session, transaction):
+    # savepoints also end here (before after_soft_rollback), keep their marks
+    if transaction.parent is None:  # rolled back or closed without a commit
+        session.info.pop("pending_events", None)
+        session.info.pop("savepoint_marks", None)
+
+
+def _make_backend():
+    if settings.EVENT_BUS_BACKEND == "postgres":
+        from app.core.db import engine
+
+        dsn = engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+        return PostgresBackend(dsn, settings.EVENT_BUS_CHANNEL)
+    return MemoryBackend()
+
+
+bus = EventBus(_make_backend(), settings.EVENT_BUS_COALESCE_MS)
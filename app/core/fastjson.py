@@ -0,0 +1,36 @@
+"""JSON for large list responses without a Pydantic model per row.
+
+Routes build plain dicts from projected columns and return `json_response()`.
+Returning a Response bypasses FastAPI's response_model validation and
+serialization, while keeping `response_model=` on the route keeps the
+OpenAPI schema unchanged. The dicts must therefore already have the shape
+the schema promises.
+
+Uses orjson when installed (`pip install -e ".[fast]"`), else the stdlib;
+both write datetimes the way Pydantic does (ISO 8601, UTC as "Z").
+"""
+import json
+from datetime import datetime
+
+from fastapi import Response
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+def _default(value):
+    if isinstance(value, datetime):
+        return value.isoformat().replace("+00:00", "Z")
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def dumps(obj) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_UTC_Z)
+    return json.dumps(obj, default=_default, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def json_response(obj, headers: dict | None = None) -> Response:
+    return Response(dumps(obj), media_type="application/json", headers=headers)
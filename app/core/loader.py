@@ -0,0 +1,95 @@
+"""Request-scoped batching of by-id lookups (the DataLoader pattern).
+
+    users = loader(db, User)
+    seller, buyer = await asyncio.gather(users.load(post.seller_id), users.load(tx.buyer_id))
+
+Every load() made in the same event-loop tick is resolved by one
+`SELECT ... WHERE id = ANY(:ids)`, and results are memoized for the life of
+the session, i.e. the request that get_db / get_read_db opened it for.
+Missing ids resolve to None.
+"""
+import asyncio
+from typing import Iterable
+
+from fastapi import HTTPException
+from sqlalchemy import any_, bindparam, select
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+class BatchLoader:
+    def __init__(self, db: AsyncSession, model, lock: asyncio.Lock):
+        self.db = db
+        self.model = model
+        # one statement text for any batch size, so it is compiled and prepared once
+        self.stmt = select(model).where(model.id == any_(bindparam("ids", type_=ARRAY(model.id.type))))
+        self._lock = lock
+        self._memo: dict[int, asyncio.Future] = {}
+        self._pending: list[int] = []
+        self._tasks: set[asyncio.Task] = set()
+
+    def load(self, id: int) -> asyncio.Future:
+        fut = self._memo.get(id)
+        if fut is None:
+            loop = asyncio.get_running_loop()
+            fut = self._memo[id] = loop.create_future()
+            if not self._pending:
+                # runs after every coroutine already scheduled this tick had its turn to load()
+                loop.call_soon(self._dispatch)
+            self._pending.append(id)
+        return fut
+
+    async def load_many(self, ids: Iterable[int]) -> list:
+        return list(await asyncio.gather(*(self.load(i) for i in ids)))
+
+    def _dispatch(self):
+        ids, self._pending = self._pending, []
+        task = asyncio.create_task(self._fetch(ids))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _fetch(self, ids: list[int]):
+        try:
+            # loaders of one session share its connection: take turns
+            async with self._lock:
+                rows = (await self.db.execute(self.stmt, {"ids": ids})).unique().scalars().all()
+        except Exception as e:
+            for i in ids:
+                # not memoized: a later load() may retry
+                fut = self._memo.pop(i)
+                if not fut.done():  # its caller may have been cancelled
+                    fut.set_exception(e)
+            return
+        found = {row.id: row for row in rows}
+        for i in ids:
+            fut = self._memo[i]
+            if fut.cancelled():
+                del self._memo[i]  # don't hand a cancelled future to the next load()
+            elif not fut.done():
+                fut.set_result(found.get(i))
+
+
+def loader(db: AsyncSession, model) -> BatchLoader:
+    """The session's loader for `model`, created on first use."""
+    loaders = db.info.setdefault("loaders", {})
+    if model not in loaders:
+        lock = db.info.setdefault("loader_lock", asyncio.Lock())
+        loaders[model] = BatchLoader(db, model, lock)
+    return loaders[model]
+
+
+MAX_BATCH_IDS = 100
+MAX_ID = 2**31 - 1  # ids are INTEGER columns; anything bigger fails the ANY(:ids) bind
+
+
+def parse_ids(raw: str) -> list[int]:
+    """`?ids=3,1,2` -> [3, 1, 2]: de-duplicated, order kept."""
+    try:
+        ids = list(dict.fromkeys(int(part) for part in raw.split(",") if part.strip()))
+    except ValueError:
+        raise HTTPException(status_code=422, detail="ids must be comma-separated integers")
+    if not ids or len(ids) > MAX_BATCH_IDS:
+        raise HTTPException(status_code=422, detail=f"ids must list 1 to {MAX_BATCH_IDS} ids")
+    if not all(1 <= i <= MAX_ID for i in ids):
+        raise HTTPException(status_code=422, detail=f"ids must be between 1 and {MAX_ID}")
+    return ids
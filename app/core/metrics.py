@@ -0,0 +1,203 @@
+"""In-process request/SQL metrics rendered in Prometheus text format.
+
+MetricsMiddleware times every HTTP request and labels it with the route
+template ("/posts/{post_id}", not the raw path). SQL statements executed
+while the request runs are counted through engine events and a contextvar,
+so N+1 patterns show up as sql_statements_per_request.
+"""
+import logging
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.requests import HTTPConnection
+
+log = logging.getLogger("app.slow_requests")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200)
+MAX_CAPTURED_STATEMENTS = 50
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class RequestStats:
+    __slots__ = ("sql_count", "sql_seconds", "statements", "in_flight_key", "_started")
+
+    def __init__(self):
+        self.sql_count = 0
+        self.sql_seconds = 0.0
+        self.statements: list[str] = []
+        self.in_flight_key: tuple | None = None
+        self._started = 0.0
+
+
+_current: ContextVar[RequestStats | None] = ContextVar("request_stats", default=None)
+
+
+class Registry:
+    def __init__(self):
+        self.requests: dict[tuple, int] = defaultdict(int)
+        self.latency: dict[tuple, Histogram] = {}
+        self.statements: dict[tuple, Histogram] = {}
+        self.sql_seconds: dict[tuple, float] = defaultdict(float)
+        self.in_flight: dict[tuple, int] = defaultdict(int)
+        self.slow_requests = 0
+        # name -> callable returning {label_value: number}; sampled at scrape time
+        self.gauges: dict[str, tuple[str, object]] = {}
+
+    def observe(self, method: str, route: str, status: int, seconds: float, stats: RequestStats):
+        key = (method, route)
+        self.requests[(method, route, status)] += 1
+        if key not in self.latency:
+            self.latency[key] = Histogram(LATENCY_BUCKETS)
+            self.statements[key] = Histogram(STATEMENT_BUCKETS)
+        self.latency[key].observe(seconds)
+        self.statements[key].observe(stats.sql_count)
+        self.sql_seconds[key] += stats.sql_seconds
+
+    def add_gauge(self, name: str, help_text: str, sample):
+        self.gauges[name] = (help_text, sample)
+
+    def render(self) -> str:
+        out: list[str] = []
+
+        out.append("# HELP http_requests_total Requests by route and status.")
+        out.append("# TYPE http_requests_total counter")
+        for (method, route, status), n in sorted(self.requests.items()):
+            out.append(f'http_requests_total{{method="{method}",route="{route}",status="{status}"}} {n}')
+
+        out.append("# HELP http_requests_in_flight Requests currently being served, by route.")
+        out.append("# TYPE http_requests_in_flight gauge")
+        for (method, route), n in sorted(self.in_flight.items()):
+            out.append(f'http_requests_in_flight{{method="{method}",route="{route}"}} {n}')
+
+        _render_histograms(out, "http_request_duration_seconds", "Request latency.", self.latency)
+        _render_histograms(out, "sql_statements_per_request", "SQL statements executed per request.", self.statements)
+
+        out.append("# HELP sql_duration_seconds_total Time spent in SQL by route.")
+        out.append("# TYPE sql_duration_seconds_total counter")
+        for (method, route), s in sorted(self.sql_seconds.items()):
+            out.append(f'sql_duration_seconds_total{{method="{method}",route="{route}"}} {s:.6f}')
+
+        out.append("# HELP http_slow_requests_total Requests over SLOW_REQUEST_MS.")
+        out.append("# TYPE http_slow_requests_total counter")
+        out.append(f"http_slow_requests_total {self.slow_requests}")
+
+        for name, (help_text, sample) in self.gauges.items():
+            out.append(f"# HELP {name} {help_text}")
+            out.append(f"# TYPE {name} gauge")
+            for label, value in sample().items():
+                if value is not None:
+                    out.append(f'{name}{{key="{label}"}} {value}')
+
+        return "\n".join(out) + "\n"
+
+
+def _render_histograms(out: list[str], name: str, help_text: str, series: dict[tuple, Histogram]):
+    out.append(f"# HELP {name} {help_text}")
+    out.append(f"# TYPE {name} histogram")
+    for (method, route), h in sorted(series.items()):
+        labels = f'method="{method}",route="{route}"'
+        running = 0
+        for bound, n in zip(h.buckets, h.counts):
+            running += n
+            out.append(f'{name}_bucket{{{labels},le="{bound}"}} {running}')
+        out.append(f'{name}_bucket{{{labels},le="+Inf"}} {h.count}')
+        out.append(f"{name}_sum{{{labels}}} {h.sum:.6f}")
+        out.append(f"{name}_count{{{labels}}} {h.count}")
+
+
+registry = Registry()
+
+
+def instrument_engine(engine: AsyncEngine):
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        stats = _current.get()
+        if stats is not None:
+            stats._started = time.perf_counter()
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        stats = _current.get()
+        if stats is not None:
+            stats.sql_count += 1
+            stats.sql_seconds += time.perf_counter() - stats._started
+            if len(stats.statements) < MAX_CAPTURED_STATEMENTS:
+                stats.statements.append(statement)
+
+
+async def track_in_flight(conn: HTTPConnection):
+    """App-wide dependency: counts the request towards its route's in-flight gauge.
+
+    The route is only known once the router has matched it, after the
+    middleware has handed the request on, so the count starts here and
+    MetricsMiddleware ends it. Requests that match no route (and WebSockets,
+    which the middleware doesn't track) aren't counted.
+    """
+    stats = _current.get()
+    if stats is not None and stats.in_flight_key is None:
+        stats.in_flight_key = (conn.scope["method"], conn.scope["route"].path)
+        registry.in_flight[stats.in_flight_key] += 1
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware (no BaseHTTPMiddleware task/stream overhead)."""
+
+    def __init__(self, app, slow_request_ms: float):
+        self.app = app
+        self.slow_seconds = slow_request_ms / 1000
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        stats = RequestStats()
+        token = _current.set(stats)
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            if stats.in_flight_key:
+                registry.in_flight[stats.in_flight_key] -= 1
+            _current.reset(token)
+
+            # the router leaves the matched route in scope; label by its template
+            # ("/posts/{post_id}") so ids never become label values
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            method = scope["method"]
+            registry.observe(method, route, status, elapsed, stats)
+            if elapsed >= self.slow_seconds:
+                registry.slow_requests += 1
+                log.warning(
+                    "slow request %s %s -> %s in %.1fms (%d SQL, %.1fms): %s",
+                    method, scope["path"], status, elapsed * 1000,
+                    stats.sql_count, stats.sql_seconds * 1000, stats.statements,
+                )
@@ -1,9 +1,21 @@
 import os
+import asyncio
 import datetime as dt
+from concurrent.futures import ThreadPoolExecutor
+
 import jwt
+from fastapi import HTTPException
 from passlib.context import CryptContext
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from app.core.config import settings
+
+# hashes made with other rounds are flagged by needs_update -> rehashed on login
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
+
+# bcrypt releases the GIL, so a small thread pool keeps it off the event loop;
+# the semaphore caps queued work so a login storm sheds load instead of piling up
+_hash_pool = ThreadPoolExecutor(max_workers=settings.PASSWORD_HASH_CONCURRENCY, thread_name_prefix="pwhash")
+_hash_slots = asyncio.Semaphore(settings.PASSWORD_HASH_CONCURRENCY)
 
 JWT_SECRET = os.getenv("JWT_SECRET", "dev-secret")
 JWT_EXPIRES_MINUTES = int(os.getenv("JWT_EXPIRES_MINUTES", "4320"))
@@ -14,10 +26,27 @@ def hash_password(password: str) -> str:
 def verify_password(password: str, password_hash: str) -> bool:
     return pwd_context.verify(password, password_hash)
 
-def create_access_token(user_id: int) -> str:
+async def _off_loop(fn, *args):
+    try:
+        await asyncio.wait_for(_hash_slots.acquire(), settings.PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=503, detail="Server busy, try again", headers={"Retry-After": "1"})
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_hash_pool, fn, *args)
+    finally:
+        _hash_slots.release()
+
+async def hash_password_async(password: str) -> str:
+    return await _off_loop(pwd_context.hash, password)
+
+async def verify_and_update_async(password: str, password_hash: str) -> tuple[bool, str | None]:
+    """(ok, new_hash): new_hash is set when the stored hash uses outdated parameters."""
+    return await _off_loop(pwd_context.verify_and_update, password, password_hash)
+
+def create_access_token(user_id: int, claims: dict | None = None) -> str:
     now = dt.datetime.utcnow()
     exp = now + dt.timedelta(minutes=JWT_EXPIRES_MINUTES)
-    payload = {"sub": str(user_id), "iat": now, "exp": exp}
+    payload = {**(claims or {}), "sub": str(user_id), "iat": now, "exp": exp}
     return jwt.encode(payload, JWT_SECRET, algorithm="HS256")
 
 def decode_token(token: str) -> int | None:
@@ -33,3 +62,10 @@ def decode_access_token(token: str) -> int | None:
     except Exception:
         return None
 
+def decode_access_claims(token: str) -> dict | None:
+    try:
+        payload = jwt.decode(token, JWT_SECRET, algorithms=["HS256"])
+        payload["sub"] = int(payload["sub"])
+        return payload
+    except Exception:
+        return None
@@ -1,8 +1,16 @@
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 
+from app.core.auth import user_cache
 from app.core.config import settings
-from app.core.db import engine, Base
+from app.core.db import engine, Base, SessionLocal, PrimaryPinMiddleware, pool_stats, replicas
+from app.core.events import bus
+from app.core.metrics import MetricsMiddleware, instrument_engine, registry, track_in_flight
+from app.models.post import install_change_feed
+from app.services.chat_writer import writer as chat_writer
+from app.services.post_cache import list_bodies, post_bodies
+from app.services import saved_searches, suggest
 
 # Routers
 from app.routers.auth import router as auth_router
@@ -10,31 +18,88 @@ from app.routers.posts import router as posts_router
 from app.routers.transactions import router as tx_router
 from app.routers.ratings import router as ratings_router
 from app.routers.chat import router as chat_router  
+from app.routers.exports import router as exports_router
+from app.routers.users import router as users_router
+from app.routers.saved_searches import router as saved_searches_router
+from app.routers.notifications import router as notifications_router
 
 import app.models 
 
 
-app = FastAPI(title="Campus Marketplace API")
+app = FastAPI(title="Campus Marketplace API", dependencies=[Depends(track_in_flight)])
 
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=[settings.FRONTEND_ORIGIN],
+    allow_origins=settings.cors_origins,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(MetricsMiddleware, slow_request_ms=settings.SLOW_REQUEST_MS)
+if replicas.engines:
+    app.add_middleware(PrimaryPinMiddleware, pin_seconds=settings.DB_PRIMARY_PIN_SECONDS)
+
+instrument_engine(engine)
+for replica in replicas.engines:
+    instrument_engine(replica)
+registry.add_gauge("db_pool", "Connection pool state.", lambda: pool_stats(engine))
+registry.add_gauge("db_replica_healthy", "1 while a read replica is in rotation (key = index in DATABASE_REPLICA_URLS).",
+                   lambda: {str(i): int(ok) for i, ok in enumerate(replicas.healthy)})
+registry.add_gauge("db_replica_lag_seconds", "Replica lag at the last health check.",
+                   lambda: {str(i): lag for i, lag in enumerate(replicas.lag)})
+registry.add_gauge("auth_user_cache", "CurrentUser cache state.", user_cache.stats)
+registry.add_gauge("post_body_cache", "GET /posts/{id} body cache state.", post_bodies.stats)
+registry.add_gauge("post_list_cache", "GET /posts body cache state.", list_bodies.stats)
+registry.add_gauge("chat_group_commit", "Chat message group-commit writer.", chat_writer.stats)
+registry.add_gauge("saved_search_index", "In-memory saved search index.", saved_searches.index.stats)
+registry.add_gauge("suggest_index", "GET /posts/suggest title word index.", suggest.titles.stats)
 
 @app.on_event("startup")
 async def startup():
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(install_change_feed)
+    async with SessionLocal() as db:
+        await saved_searches.load(db)
+        await suggest.load(db)
+    await bus.start()
+    await replicas.start()
+    if settings.CHAT_GROUP_COMMIT:
+        await chat_writer.start()
+
+@app.on_event("shutdown")
+async def shutdown():
+    await chat_writer.stop()
+    await replicas.stop()
+    await bus.stop()
 
 @app.get("/health")
 def health():
     return {"ok": True}
 
+@app.get("/health/db")
+def db_health():
+    return {"pool": pool_stats(engine), "replicas": replicas.stats()}
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/health/cache")
+def cache_health():
+    return {
+        "auth_user_cache": user_cache.stats(),
+        "post_body_cache": post_bodies.stats(),
+        "post_list_cache": list_bodies.stats(),
+        "suggest_index": suggest.titles.stats(),
+    }
+
 app.include_router(auth_router)
 app.include_router(posts_router)
 app.include_router(tx_router)
 app.include_router(ratings_router)
-app.include_router(chat_router)  
+app.include_router(chat_router)
+app.include_router(exports_router)
+app.include_router(users_router)
+app.include_router(saved_searches_router)
+app.include_router(notifications_router)  
@@ -1,7 +1,11 @@
 from app.models.user import User
 from app.models.post import Post
+from app.models.post_tombstone import PostTombstone
 from app.models.transaction import Transaction
 from app.models.rating import Rating
+from app.models.user_reputation import UserReputation
+from app.models.saved_search import SavedSearch
+from app.models.notification import Notification
 
 # chat
 from app.models.conversation import Conversation
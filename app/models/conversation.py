@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import BigInteger, DateTime, ForeignKey, UniqueConstraint, func
+from sqlalchemy import BigInteger, DateTime, ForeignKey, Index, UniqueConstraint, func
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.core.db import Base
@@ -35,3 +35,12 @@ class Conversation(Base):
         onupdate=func.now(),
         nullable=False,
     )
+
+    # denormalized from messages (see app/services/chat_counters.py)
+    last_message_id: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    last_message_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+
+# inbox: a participant's threads, most recently active first
+Index("ix_conversations_buyer_updated", Conversation.buyer_id, Conversation.updated_at.desc(), Conversation.id.desc())
+Index("ix_conversations_seller_updated", Conversation.seller_id, Conversation.updated_at.desc(), Conversation.id.desc())
@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import BigInteger, DateTime, ForeignKey, func
+from sqlalchemy import BigInteger, DateTime, ForeignKey, Index, Integer, func
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.core.db import Base
@@ -25,9 +25,16 @@ class ConversationRead(Base):
 
     last_read_message_id: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
 
+    # messages from the other participant since last_read_message_id
+    unread_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+
     updated_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
         server_default=func.now(),
         onupdate=func.now(),
         nullable=False,
     )
+
+
+# badge count: sum of a user's counters
+Index("ix_conversation_reads_user", ConversationRead.user_id)
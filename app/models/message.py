@@ -27,3 +27,5 @@ class Message(Base):
 
 
 Index("ix_messages_conversation_created", Message.conversation_id, Message.created_at)
+# latest-message lookups and "messages after my read marker" counts
+Index("ix_messages_conversation_id", Message.conversation_id, Message.id)
@@ -0,0 +1,28 @@
+from datetime import datetime
+
+from sqlalchemy import BigInteger, DateTime, ForeignKey, Index, UniqueConstraint, func, text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.db import Base
+
+
+class Notification(Base):
+    """'A post matching your saved search was listed', one per (search, post)."""
+    __tablename__ = "notifications"
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    user_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    saved_search_id: Mapped[int] = mapped_column(
+        BigInteger, ForeignKey("saved_searches.id", ondelete="CASCADE"), nullable=False
+    )
+    post_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("posts.id", ondelete="CASCADE"), nullable=False)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    read_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (UniqueConstraint("saved_search_id", "post_id"),)
+
+
+# inbox, newest first; the partial index keeps the unread badge count cheap
+Index("ix_notifications_user_id", Notification.user_id, Notification.id.desc())
+Index("ix_notifications_user_unread", Notification.user_id, postgresql_where=text("read_at IS NULL"))
@@ -1,6 +1,7 @@
 import datetime
-from sqlalchemy import String, Integer, ForeignKey, DateTime
-from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import DDL, String, Integer, BigInteger, Float, ForeignKey, DateTime, Index, Computed, event, text
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 from app.core.db import Base
 
@@ -17,8 +18,106 @@ class Post(Base):
 
     status: Mapped[str] = mapped_column(String(20), default="active")
 
+    # item location (for radius searching); geo_cell is services.geo.grid_cell(lat, lng)
+    lat: Mapped[float | None] = mapped_column(Float, nullable=True)
+    lng: Mapped[float | None] = mapped_column(Float, nullable=True)
+    geo_cell: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+
+    # full-text search document, maintained by Postgres (title weighted over description)
+    search_vector: Mapped[str | None] = mapped_column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(description, '')), 'B')",
+            persisted=True,
+        ),
+        deferred=True,
+    )
+
     from datetime import datetime
 
     created_at: Mapped[datetime] = mapped_column(
     DateTime(timezone=True), server_default=func.now(), nullable=False
     )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
+    )
+    # bumped by the ORM on every UPDATE (and checked, so lost updates raise); feeds the ETag
+    version: Mapped[int] = mapped_column(Integer, nullable=False, server_default="1")
+
+    # id of the transaction that last inserted/updated the row, set by
+    # trg_posts_change_seq (GET /posts/changes orders and pages by it)
+    change_seq: Mapped[int] = mapped_column(
+        BigInteger, server_default=text("pg_current_xact_id()::text::bigint"), nullable=False, deferred=True
+    )
+
+    __mapper_args__ = {"version_id_col": version}
+
+    # joined into every Post load, so a page of posts and their sellers'
+    # ratings is still one query
+    seller_reputation = relationship(
+        "UserReputation",
+        primaryjoin="foreign(Post.seller_id) == UserReputation.user_id",
+        lazy="joined",
+        viewonly=True,
+        uselist=False,
+    )
+
+
+# feed ordering is (created_at DESC, id DESC); the composites let each filter
+# walk its own slice of that order and stop after one page
+Index("ix_posts_created_id", Post.created_at.desc(), Post.id.desc())
+Index("ix_posts_status_created_id", Post.status, Post.created_at.desc(), Post.id.desc())
+Index("ix_posts_seller_created_id", Post.seller_id, Post.created_at.desc(), Post.id.desc())
+Index("ix_posts_geo_cell", Post.geo_cell)
+Index("ix_posts_search_vector", Post.search_vector, postgresql_using="gin")
+Index("ix_posts_change_seq_id", Post.change_seq, Post.id)
+
+
+# every writer (ORM, Core UPDATEs, bulk import, plain SQL) stamps change_seq and
+# leaves a tombstone on delete. The only copy of this DDL: create_all runs it
+# for a new posts table, install_change_feed() at startup for one made by
+# scripts/setup.sql, and the 9b4e2d7c1a53 migration imports it
+POST_CHANGE_DDL = [
+    """
+    CREATE OR REPLACE FUNCTION posts_change_seq() RETURNS trigger AS $$
+    BEGIN
+      NEW.change_seq := pg_current_xact_id()::text::bigint;
+      RETURN NEW;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION posts_tombstone() RETURNS trigger AS $$
+    BEGIN
+      INSERT INTO post_tombstones (post_id, change_seq)
+      VALUES (OLD.id, pg_current_xact_id()::text::bigint)
+      ON CONFLICT (post_id) DO UPDATE SET change_seq = EXCLUDED.change_seq, deleted_at = now();
+      RETURN OLD;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS trg_posts_change_seq ON posts",
+    """
+    CREATE TRIGGER trg_posts_change_seq BEFORE INSERT OR UPDATE ON posts
+    FOR EACH ROW EXECUTE FUNCTION posts_change_seq()
+    """,
+    "DROP TRIGGER IF EXISTS trg_posts_tombstone ON posts",
+    """
+    CREATE TRIGGER trg_posts_tombstone AFTER DELETE ON posts
+    FOR EACH ROW EXECUTE FUNCTION posts_tombstone()
+    """,
+]
+for _sql in POST_CHANGE_DDL:
+    event.listen(Post.__table__, "after_create", DDL(_sql))
+
+
+def install_change_feed(conn):
+    """Run POST_CHANGE_DDL unless both triggers are already on posts (sync, for run_sync)."""
+    found = conn.execute(text("""
+        SELECT count(*) FROM pg_trigger
+        WHERE tgrelid = 'posts'::regclass AND tgname IN ('trg_posts_change_seq', 'trg_posts_tombstone')
+    """)).scalar()
+    if found < 2:
+        for sql in POST_CHANGE_DDL:
+            conn.execute(DDL(sql))
@@ -0,0 +1,23 @@
+from datetime import datetime
+
+from sqlalchemy import BigInteger, DateTime, Index, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.db import Base
+
+
+class PostTombstone(Base):
+    """A deleted post, kept so GET /posts/changes can report the deletion.
+    Written by the posts delete trigger (see models/post.py)."""
+    __tablename__ = "post_tombstones"
+
+    # no FK: the post row is gone
+    post_id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    change_seq: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    deleted_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+
+# GET /posts/changes pages on (change_seq, post_id)
+Index("ix_post_tombstones_change_seq_id", PostTombstone.change_seq, PostTombstone.post_id)
@@ -1,10 +1,14 @@
-from sqlalchemy import Integer, ForeignKey, String
+from datetime import datetime
+
+from sqlalchemy import DateTime, Integer, ForeignKey, String, UniqueConstraint, func
 from sqlalchemy.orm import Mapped, mapped_column
 from app.core.db import Base
 
 
 class Rating(Base):
     __tablename__ = "ratings"
+    # one rating per side of a transaction: the buyer rates the seller and vice versa
+    __table_args__ = (UniqueConstraint("transaction_id", "rater_id", name="uq_ratings_transaction_rater"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     transaction_id: Mapped[int] = mapped_column(ForeignKey("transactions.id"))
@@ -14,3 +18,7 @@ class Rating(Base):
 
     stars: Mapped[int] = mapped_column(Integer)
     comment: Mapped[str | None] = mapped_column(String(1000))
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
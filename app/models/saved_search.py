@@ -0,0 +1,31 @@
+from datetime import datetime
+
+from sqlalchemy import BigInteger, DateTime, Float, ForeignKey, Index, Integer, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.db import Base
+
+
+class SavedSearch(Base):
+    """A standing query; new posts matching it land in the owner's notifications
+    (see services.saved_searches). Every predicate is optional; all given must match."""
+    __tablename__ = "saved_searches"
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    user_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+
+    name: Mapped[str | None] = mapped_column(String(80), nullable=True)
+    # every word must appear in the post's title or description
+    keywords: Mapped[str | None] = mapped_column(String(200), nullable=True)
+    min_price_cents: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    max_price_cents: Mapped[int | None] = mapped_column(Integer, nullable=True)
+
+    # within radius_km of (lat, lng); posts without a location never match
+    lat: Mapped[float | None] = mapped_column(Float, nullable=True)
+    lng: Mapped[float | None] = mapped_column(Float, nullable=True)
+    radius_km: Mapped[float | None] = mapped_column(Float, nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
+Index("ix_saved_searches_user", SavedSearch.user_id)
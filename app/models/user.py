@@ -1,5 +1,5 @@
-from sqlalchemy import String, Integer
-from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import String, Integer, Float
+from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.core.db import Base
 
 class User(Base):
@@ -9,3 +9,10 @@ class User(Base):
     email: Mapped[str] = mapped_column(String(255), unique=True, index=True)
     name: Mapped[str] = mapped_column(String(120))
     password_hash: Mapped[str | None] = mapped_column(String, nullable=True)
+
+    # campus / default discovery settings
+    campus_lat: Mapped[float | None] = mapped_column(Float, nullable=True)
+    campus_lng: Mapped[float | None] = mapped_column(Float, nullable=True)
+    default_radius_km: Mapped[float] = mapped_column(Float, default=10.0, server_default="10")
+
+    reputation = relationship("UserReputation", lazy="joined", viewonly=True, uselist=False, cascade="expunge")
@@ -0,0 +1,35 @@
+from datetime import datetime
+
+from sqlalchemy import BigInteger, DateTime, ForeignKey, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.db import Base
+
+
+class UserReputation(Base):
+    """Per-user rating aggregate, kept current by services.reputation.record_rating()."""
+    __tablename__ = "user_reputations"
+
+    user_id: Mapped[int] = mapped_column(
+        BigInteger, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+
+    rating_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    star_sum: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+
+    # histogram: how many 1..5 star ratings
+    stars_1: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    stars_2: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    stars_3: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    stars_4: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    stars_5: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+
+    last_rated_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    @property
+    def average_stars(self) -> float | None:
+        return round(self.star_sum / self.rating_count, 2) if self.rating_count else None
+
+    @property
+    def histogram(self) -> list[int]:
+        return [self.stars_1, self.stars_2, self.stars_3, self.stars_4, self.stars_5]
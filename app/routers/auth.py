@@ -1,12 +1,15 @@
 from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
 
 from app.core.db import get_db
-from app.core.security import hash_password, verify_password, create_access_token
-from app.core.auth import require_user, CurrentUser, COOKIE_NAME
+from app.core.security import hash_password_async, verify_and_update_async
+from app.core.auth import require_user, CurrentUser, COOKIE_NAME, invalidate_user, issue_token
+from app.core.events import queue_event
 from app.models.user import User
-from app.schemas.user import SignupIn, LoginIn, UserOut
+from app.models.user_reputation import UserReputation
+from app.schemas.user import SignupIn, LoginIn, UserOut, UserUpdate
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
@@ -25,16 +28,27 @@ async def signup(payload: SignupIn, response: Response, db: AsyncSession = Depen
     if existing:
         raise HTTPException(status_code=409, detail="Email already in use")
 
+    # don't hold a pooled connection while bcrypt runs
+    await db.rollback()
+
     user = User(
         email=payload.email,
         name=payload.name,
-        password_hash=hash_password(payload.password),
+        password_hash=await hash_password_async(payload.password),
+        campus_lat=payload.campus_lat,
+        campus_lng=payload.campus_lng,
+        default_radius_km=payload.default_radius_km,
     )
     db.add(user)
-    await db.commit()
+    try:
+        await db.commit()
+    except IntegrityError:
+        # a concurrent signup took the email while bcrypt ran
+        await db.rollback()
+        raise HTTPException(status_code=409, detail="Email already in use")
     await db.refresh(user)
 
-    token = create_access_token(user.id)
+    token = issue_token(user)
     response.set_cookie(COOKIE_NAME, token, **COOKIE_KWARGS)
 
     return user
@@ -47,10 +61,20 @@ async def login(payload: LoginIn, response: Response, db: AsyncSession = Depends
     if not user or not user.password_hash:
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
-    if not verify_password(payload.password, user.password_hash):
+    # don't hold a pooled connection while bcrypt runs
+    db.expunge(user)
+    await db.rollback()
+
+    ok, new_hash = await verify_and_update_async(payload.password, user.password_hash)
+    if not ok:
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
-    token = create_access_token(user.id)
+    # cost parameters changed since this hash was made
+    if new_hash:
+        await db.execute(update(User).where(User.id == user.id).values(password_hash=new_hash))
+        await db.commit()
+
+    token = issue_token(user)
     response.set_cookie(COOKIE_NAME, token, **COOKIE_KWARGS)
 
     return user
@@ -68,5 +92,38 @@ async def logout(response: Response):
 
 @router.get("/me", response_model=UserOut)
 async def me(user: CurrentUser = Depends(require_user), db: AsyncSession = Depends(get_db)):
-    # Option 1: return CurrentUser -> UserOut compatible fields
-    return {"id": user.id, "email": user.email, "name": user.name}
+    # CurrentUser only carries id/email/name; the campus fields come from the row
+    q = (
+        select(User, UserReputation)
+        .outerjoin(UserReputation, UserReputation.user_id == User.id)
+        .where(User.id == user.id)
+    )
+    found = (await db.execute(q)).one_or_none()
+    if not found:
+        raise HTTPException(status_code=404)
+    row, reputation = found
+    return {"id": row.id, "email": row.email, "name": row.name,
+            "campus_lat": row.campus_lat, "campus_lng": row.campus_lng,
+            "default_radius_km": row.default_radius_km, "reputation": reputation}
+
+
+@router.patch("/me", response_model=UserOut)
+async def update_me(payload: UserUpdate,
+                    response: Response,
+                    user: CurrentUser = Depends(require_user),
+                    db: AsyncSession = Depends(get_db)):
+    row = await db.get(User, user.id)
+    if not row:
+        raise HTTPException(status_code=404)
+
+    for field, value in payload.model_dump(exclude_unset=True).items():
+        setattr(row, field, value)
+
+    queue_event(db, {"type": "user.updated", "user_id": row.id})
+    await db.commit()
+    await db.refresh(row)
+
+    invalidate_user(row.id)
+    # claims in the old cookie are stale now
+    response.set_cookie(COOKIE_NAME, issue_token(row), **COOKIE_KWARGS)
+    return row
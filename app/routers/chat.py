@@ -1,10 +1,13 @@
-from sqlalchemy import and_, desc, func, or_, select
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy import and_, desc, func, select, text, tuple_, union_all
+from sqlalchemy.orm import aliased
 from sqlalchemy.ext.asyncio import AsyncSession
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, WebSocket
 
-from app.core.db import get_db
-from app.core.auth import CurrentUser, require_user
+from app.core.config import settings
+from app.core.db import SessionLocal, get_db, get_read_db
+from app.core.auth import COOKIE_NAME, CurrentUser, load_current_user, require_user
+from app.core.events import queue_event
+from app.core.fastjson import json_response
 from app.models.post import Post
 from app.models.conversation import Conversation
 from app.models.message import Message
@@ -12,9 +15,15 @@ from app.models.conversation_read import ConversationRead
 from app.schemas.chat import (
     ConversationCreateIn,
     ConversationOut,
+    ConversationPage,
+    MarkReadIn,
     MessageCreateIn,
     MessageOut,
 )
+from app.services.chat_counters import NewMessage, record_messages
+from app.services.chat_hub import hub
+from app.services.chat_writer import PendingMessage, writer
+from app.services.pagination import decode_keyset_cursor, encode_cursor
 
 router = APIRouter(prefix="/chat", tags=["chat"])
 
@@ -32,96 +41,148 @@ async def _get_conversation_or_403(
     return conv
 
 
+# Hot-path upserts are plain SQL: SQLAlchemy never caches the compiled form of
+# postgresql insert() constructs, and recompiling costs more than the round
+# trips they save.
+
+# Derive the seller from the post, insert, and on conflict return the existing
+# thread. The no-op DO UPDATE (same post_id, so a HOT update that leaves
+# updated_at alone) is what makes RETURNING yield the row even when a
+# concurrent open inserted it after this statement's snapshot.
+OPEN_CONVERSATION_SQL = text("""
+    INSERT INTO conversations (post_id, buyer_id, seller_id)
+    SELECT p.id, CAST(:buyer_id AS bigint), p.seller_id
+    FROM posts p
+    WHERE p.id = :post_id AND p.seller_id <> CAST(:buyer_id AS bigint)
+    ON CONFLICT ON CONSTRAINT uq_conversation_thread
+    DO UPDATE SET post_id = EXCLUDED.post_id
+    RETURNING id, post_id, buyer_id, seller_id, created_at, updated_at, last_message_at
+""")
+
+# Move the caller's read marker to each thread's latest message and zero the
+# unread counter; threads the caller isn't part of drop out in `convs`.
+# FOR SHARE waits for a sender that has bumped last_message_id but not yet
+# committed, then reads its message id, so zeroing the counter can't wipe out
+# a bump for a message past the marker. Rows are locked in id order, like
+# record_messages() does.
+MARK_READ_SQL = text("""
+    WITH convs AS (
+        SELECT id, buyer_id, seller_id, last_message_id
+        FROM conversations
+        WHERE id = ANY(CAST(:conversation_ids AS bigint[]))
+          AND CAST(:user_id AS bigint) IN (buyer_id, seller_id)
+        ORDER BY id
+        FOR SHARE
+    ), upserted AS (
+        INSERT INTO conversation_reads (conversation_id, user_id, last_read_message_id, unread_count)
+        SELECT id, CAST(:user_id AS bigint), last_message_id, 0 FROM convs
+        ON CONFLICT (conversation_id, user_id) DO UPDATE
+        SET last_read_message_id = EXCLUDED.last_read_message_id,
+            unread_count = 0,
+            updated_at = now()
+        RETURNING conversation_id, last_read_message_id
+    )
+    SELECT u.conversation_id, u.last_read_message_id, c.buyer_id, c.seller_id
+    FROM upserted u
+    JOIN convs c ON c.id = u.conversation_id
+""")
+
+
 @router.post("/conversations", response_model=ConversationOut)
 async def create_or_get_conversation(
     payload: ConversationCreateIn,
     db: AsyncSession = Depends(get_db),
     user: CurrentUser = Depends(require_user),
 ):
-    # 1) fetch post -> derive seller
-    post = (await db.execute(select(Post).where(Post.id == payload.post_id))).scalar_one_or_none()
-    if not post:
-        raise HTTPException(status_code=404, detail="Post not found")
+    params = {"post_id": payload.post_id, "buyer_id": user.id}
+    row = (await db.execute(OPEN_CONVERSATION_SQL, params)).one_or_none()
+    if row is None:
+        # error path only: find out why nothing was selected
+        post = await db.get(Post, payload.post_id)
+        if not post:
+            raise HTTPException(status_code=404, detail="Post not found")
+        raise HTTPException(status_code=400, detail="Cannot message yourself")
 
-    seller_id = getattr(post, "seller_id", None) or getattr(post, "user_id", None) or getattr(post, "owner_id", None)
-    if not seller_id:
-        raise HTTPException(status_code=500, detail="Post missing seller_id/user_id")
+    await db.commit()
+    return ConversationOut.model_validate(row)
 
-    buyer_id = user.id
-    if buyer_id == seller_id:
-        raise HTTPException(status_code=400, detail="Cannot message yourself")
 
-    # 2) try insert; if unique conflict -> fetch existing
-    conv = Conversation(post_id=post.id, buyer_id=buyer_id, seller_id=seller_id)
-    db.add(conv)
-    try:
-        await db.commit()
-        await db.refresh(conv)
-        return ConversationOut.model_validate(conv)
-    except IntegrityError:
-        await db.rollback()
+async def _mark_read(db: AsyncSession, user_id: int, conversation_ids: list[int]):
+    """One round trip for any number of threads; returns
+    (conversation_id, last_read_message_id, buyer_id, seller_id) per thread marked."""
+    params = {"conversation_ids": conversation_ids, "user_id": user_id}
+    rows = (await db.execute(MARK_READ_SQL, params)).all()
 
-        q = select(Conversation).where(
-            and_(
-                Conversation.post_id == post.id,
-                Conversation.buyer_id == buyer_id,
-                Conversation.seller_id == seller_id,
-            )
-        )
-        existing = (await db.execute(q)).scalar_one()
-        return ConversationOut.model_validate(existing)
+    for conv_id, last_id, buyer_id, seller_id in rows:
+        queue_event(db, {
+            "type": "read.marked",
+            "conversation_id": conv_id,
+            "user_id": user_id,
+            "last_read_message_id": last_id,
+            "recipients": [buyer_id, seller_id],
+        })
+    return rows
 
 
-@router.get("/conversations", response_model=list[ConversationOut])
+@router.get("/conversations", response_model=ConversationPage)
 async def list_conversations(
-    db: AsyncSession = Depends(get_db),
+    cursor: str | None = Query(None),
+    limit: int = Query(30, ge=1, le=100),
+    db: AsyncSession = Depends(get_read_db),
     user: CurrentUser = Depends(require_user),
 ):
-    # base list
+    after = decode_keyset_cursor(cursor) if cursor else None
+
+    # one index-ordered walk per role ((buyer_id | seller_id, updated_at, id)),
+    # each stopping after limit + 1 rows; an OR across the two columns would
+    # instead collect every thread of the user and sort them
+    def role_page(participant):
+        q = select(Conversation.id, Conversation.updated_at).where(participant == user.id)
+        if after:
+            q = q.where(tuple_(Conversation.updated_at, Conversation.id) < tuple_(*after))
+        return q.order_by(desc(Conversation.updated_at), desc(Conversation.id)).limit(limit + 1)
+
+    page = union_all(role_page(Conversation.buyer_id), role_page(Conversation.seller_id)).subquery("page")
+
+    # counters are maintained on write, so the page is then two PK-joins away;
+    # projected in ConversationOut's shape and encoded without Pydantic
+    last = aliased(Message)
     q = (
-        select(Conversation)
-        .where(or_(Conversation.buyer_id == user.id, Conversation.seller_id == user.id))
-        .order_by(desc(Conversation.updated_at))
-    )
-    conversations = (await db.execute(q)).scalars().all()
-
-    # hackathon-simple “Option 1”: for each conversation, query last message + unread_count
-    out: list[ConversationOut] = []
-    for conv in conversations:
-        # last message
-        last_q = (
-            select(Message)
-            .where(Message.conversation_id == conv.id)
-            .order_by(desc(Message.created_at))
-            .limit(1)
-        )
-        last = (await db.execute(last_q)).scalar_one_or_none()
-
-        # read row
-        read_q = select(ConversationRead).where(
-            and_(ConversationRead.conversation_id == conv.id, ConversationRead.user_id == user.id)
+        select(
+            Conversation.id, Conversation.post_id, Conversation.buyer_id, Conversation.seller_id,
+            Conversation.created_at, Conversation.updated_at,
+            last.body.label("last_message"), Conversation.last_message_at,
+            func.coalesce(ConversationRead.unread_count, 0).label("unread_count"),
         )
-        read_row = (await db.execute(read_q)).scalar_one_or_none()
-
-        # unread: messages after last_read_message_id AND not sent by me
-        unread_q = select(func.count()).select_from(Message).where(
-            and_(
-                Message.conversation_id == conv.id,
-                Message.sender_id != user.id,
-            )
+        .select_from(page)
+        .join(Conversation, Conversation.id == page.c.id)
+        .outerjoin(last, last.id == Conversation.last_message_id)
+        .outerjoin(
+            ConversationRead,
+            and_(ConversationRead.conversation_id == Conversation.id, ConversationRead.user_id == user.id),
         )
-        if read_row and read_row.last_read_message_id:
-            unread_q = unread_q.where(Message.id > read_row.last_read_message_id)
+        .order_by(desc(page.c.updated_at), desc(page.c.id))
+        .limit(limit + 1)
+    )
+    rows = (await db.execute(q)).all()
 
-        unread_count = (await db.execute(unread_q)).scalar_one()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].updated_at, rows[-1].id)
 
-        dto = ConversationOut.model_validate(conv)
-        dto.last_message = last.body if last else None
-        dto.last_message_at = last.created_at if last else None
-        dto.unread_count = int(unread_count)
-        out.append(dto)
+    return json_response({"items": [r._asdict() for r in rows], "next_cursor": next_cursor})
 
-    return out
+
+@router.get("/unread")
+async def unread_badge(
+    db: AsyncSession = Depends(get_read_db),
+    user: CurrentUser = Depends(require_user),
+):
+    q = select(func.coalesce(func.sum(ConversationRead.unread_count), 0)).where(
+        ConversationRead.user_id == user.id
+    )
+    return {"unread_count": int((await db.execute(q)).scalar_one())}
 
 
 @router.get("/conversations/{conversation_id}/messages", response_model=list[MessageOut])
@@ -129,20 +190,23 @@ async def get_messages(
     conversation_id: int,
     limit: int = Query(50, ge=1, le=200),
     before_id: int | None = Query(None, ge=1),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     user: CurrentUser = Depends(require_user),
 ):
     await _get_conversation_or_403(db, conversation_id, user)
 
-    q = select(Message).where(Message.conversation_id == conversation_id)
+    q = select(
+        Message.id, Message.conversation_id, Message.sender_id, Message.body, Message.created_at,
+    ).where(Message.conversation_id == conversation_id)
     if before_id:
         q = q.where(Message.id < before_id)
 
-    q = q.order_by(desc(Message.created_at)).limit(limit)
-    rows = (await db.execute(q)).scalars().all()
+    # by id, like the before_id cursor: a group-committed batch shares one created_at
+    q = q.order_by(desc(Message.id)).limit(limit)
+    rows = (await db.execute(q)).all()
 
-    # return newest-last for UI convenience
-    return list(reversed([MessageOut.model_validate(m) for m in rows]))
+    # return newest-last for UI convenience; rows are MessageOut-shaped already
+    return json_response([r._asdict() for r in reversed(rows)])
 
 
 @router.post("/conversations/{conversation_id}/messages", response_model=MessageOut)
@@ -158,14 +222,27 @@ async def send_message(
     if not body:
         raise HTTPException(status_code=422, detail="Message body required")
 
+    recipient_id = conv.seller_id if user.id == conv.buyer_id else conv.buyer_id
+    if writer.running:
+        pending = PendingMessage(conv.id, user.id, recipient_id, body)
+        # the writer has its own session; give this connection back while we wait
+        await db.rollback()
+        return await writer.submit(pending)
+
     msg = Message(conversation_id=conv.id, sender_id=user.id, body=body)
     db.add(msg)
+    await db.flush()
 
-    # bump conversation updated_at by touching it (simple)
-    conv.updated_at = func.now()  # type: ignore
+    # same transaction: last_message_*, updated_at and the recipient's unread counter
+    await record_messages(db, [NewMessage(conv.id, msg.id, msg.created_at, recipient_id)])
 
+    queue_event(db, {
+        "type": "message.created",
+        "conversation_id": conv.id,
+        "message_id": msg.id,
+        "recipients": [conv.buyer_id, conv.seller_id],
+    })
     await db.commit()
-    await db.refresh(msg)
     return MessageOut.model_validate(msg)
 
 
@@ -175,26 +252,47 @@ async def mark_read(
     db: AsyncSession = Depends(get_db),
     user: CurrentUser = Depends(require_user),
 ):
-    await _get_conversation_or_403(db, conversation_id, user)
-
-    # latest message id
-    last_id_q = select(Message.id).where(Message.conversation_id == conversation_id).order_by(desc(Message.id)).limit(1)
-    last_id = (await db.execute(last_id_q)).scalar_one_or_none()
+    rows = await _mark_read(db, user.id, [conversation_id])
+    if not rows:
+        await _get_conversation_or_403(db, conversation_id, user)
 
-    if last_id is None:
-        return {"ok": True, "last_read_message_id": None}
-
-    # upsert read row
-    read_q = select(ConversationRead).where(
-        and_(ConversationRead.conversation_id == conversation_id, ConversationRead.user_id == user.id)
-    )
-    read_row = (await db.execute(read_q)).scalar_one_or_none()
+    await db.commit()
+    return {"ok": True, "last_read_message_id": rows[0].last_read_message_id}
 
-    if not read_row:
-        read_row = ConversationRead(conversation_id=conversation_id, user_id=user.id, last_read_message_id=last_id)
-        db.add(read_row)
-    else:
-        read_row.last_read_message_id = last_id
 
+@router.post("/read")
+async def mark_read_many(
+    payload: MarkReadIn,
+    db: AsyncSession = Depends(get_db),
+    user: CurrentUser = Depends(require_user),
+):
+    rows = await _mark_read(db, user.id, payload.conversation_ids)
     await db.commit()
-    return {"ok": True, "last_read_message_id": last_id}
+
+    read = {r.conversation_id: r.last_read_message_id for r in rows}
+    return {
+        "ok": True,
+        "read": [{"conversation_id": cid, "last_read_message_id": mid} for cid, mid in read.items()],
+        "skipped": [cid for cid in dict.fromkeys(payload.conversation_ids) if cid not in read],
+    }
+
+
+@router.websocket("/ws")
+async def chat_ws(websocket: WebSocket):
+    # CORSMiddleware doesn't look at WebSocket handshakes, and the cookie rides
+    # along from any page, so a cross-site page could open the socket as the
+    # user. Browsers always send Origin; clients that aren't browsers don't.
+    origin = websocket.headers.get("origin")
+    if origin is not None and origin not in settings.cors_origins:
+        await websocket.close(code=1008)
+        return
+
+    # short-lived session: don't pin a pooled connection for the socket's lifetime
+    async with SessionLocal() as db:
+        user = await load_current_user(db, websocket.cookies.get(COOKIE_NAME))
+    if not user:
+        await websocket.close(code=1008)
+        return
+
+    await websocket.accept()
+    await hub.serve(websocket, user.id)
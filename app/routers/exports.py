@@ -0,0 +1,98 @@
+import zlib
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.db import SessionLocal, engine, get_db, read_engine
+from app.core.auth import CurrentUser, require_user
+from app.core.fastjson import dumps
+from app.models.conversation import Conversation
+from app.models.message import Message
+from app.models.post import Post
+from app.models.transaction import Transaction
+
+router = APIRouter(prefix="/exports", tags=["exports"])
+
+# rows fetched per server-side cursor round trip
+EXPORT_BATCH_SIZE = 1000
+
+
+async def _ndjson_rows(stmt, gzip: bool, bind):
+    # own session: the request's get_db session may be closed before the body
+    # finishes streaming, and this one has to live as long as the cursor
+    compressor = zlib.compressobj(wbits=31) if gzip else None
+    async with SessionLocal(bind=bind) as db:
+        result = await db.stream(stmt.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        async for rows in result.partitions():
+            # same JSON (datetimes in UTC as "Z") as the API's responses
+            chunk = b"".join(dumps(r._asdict()) + b"\n" for r in rows)
+            if compressor:
+                # sync flush so each batch reaches the client now, not at the end
+                chunk = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+            yield chunk
+    if compressor:
+        yield compressor.flush()
+
+
+async def _export(request: Request, db: AsyncSession, stmt, filename: str) -> StreamingResponse:
+    # the request session (auth, permission checks) is done; hand its pooled
+    # connection back before the long-lived export takes its own
+    await db.close()
+
+    gzip = "gzip" in request.headers.get("accept-encoding", "")
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+        headers["Vary"] = "Accept-Encoding"
+    bind = read_engine(request) or engine
+    return StreamingResponse(_ndjson_rows(stmt, gzip, bind), media_type="application/x-ndjson", headers=headers)
+
+
+@router.get("/posts")
+async def export_posts(request: Request,
+                       status: str | None = Query(None),
+                       seller_id: int | None = Query(None, ge=1),
+                       db: AsyncSession = Depends(get_db),
+                       user: CurrentUser = Depends(require_user)):
+    stmt = select(
+        Post.id, Post.seller_id, Post.title, Post.description, Post.price_cents,
+        Post.status, Post.lat, Post.lng, Post.created_at, Post.updated_at,
+    )
+    if status is not None:
+        stmt = stmt.where(Post.status == status)
+    if seller_id is not None:
+        stmt = stmt.where(Post.seller_id == seller_id)
+    return await _export(request, db, stmt.order_by(Post.id), "posts.ndjson")
+
+
+@router.get("/transactions")
+async def export_transactions(request: Request,
+                              db: AsyncSession = Depends(get_db),
+                              user: CurrentUser = Depends(require_user)):
+    stmt = (
+        select(Transaction.id, Transaction.post_id, Transaction.buyer_id, Transaction.seller_id, Transaction.status)
+        .where(or_(Transaction.buyer_id == user.id, Transaction.seller_id == user.id))
+        .order_by(Transaction.id)
+    )
+    return await _export(request, db, stmt, "transactions.ndjson")
+
+
+@router.get("/conversations/{conversation_id}/messages")
+async def export_messages(conversation_id: int,
+                          request: Request,
+                          db: AsyncSession = Depends(get_db),
+                          user: CurrentUser = Depends(require_user)):
+    conv = await db.get(Conversation, conversation_id)
+    if not conv:
+        raise HTTPException(status_code=404, detail="Conversation not found")
+    if user.id not in (conv.buyer_id, conv.seller_id):
+        raise HTTPException(status_code=403, detail="Not allowed")
+
+    stmt = (
+        select(Message.id, Message.conversation_id, Message.sender_id, Message.body, Message.created_at)
+        .where(Message.conversation_id == conversation_id)
+        .order_by(Message.id)
+    )
+    return await _export(request, db, stmt, f"conversation-{conversation_id}.ndjson")
@@ -0,0 +1,60 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import desc, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.db import get_db, get_read_db
+from app.core.auth import CurrentUser, require_user
+from app.core.loader import loader
+from app.models.notification import Notification
+from app.models.post import Post
+from app.schemas.post import PostOut
+from app.schemas.saved_search import NotificationOut, NotificationPage
+
+router = APIRouter(prefix="/notifications", tags=["notifications"])
+
+
+@router.get("", response_model=NotificationPage)
+async def list_notifications(limit: int = Query(50, ge=1, le=200),
+                             before_id: int | None = Query(None, ge=1),
+                             unread_only: bool = Query(False),
+                             db: AsyncSession = Depends(get_read_db),
+                             user: CurrentUser = Depends(require_user)):
+    """Newest first; page back with before_id=<last id seen>."""
+    q = select(Notification).where(Notification.user_id == user.id)
+    if before_id:
+        q = q.where(Notification.id < before_id)
+    if unread_only:
+        q = q.where(Notification.read_at.is_(None))
+    rows = (await db.execute(q.order_by(desc(Notification.id)).limit(limit))).scalars().all()
+
+    unread = (await db.execute(
+        select(func.count()).select_from(Notification)
+        .where(Notification.user_id == user.id, Notification.read_at.is_(None))
+    )).scalar_one()
+
+    posts = await loader(db, Post).load_many(n.post_id for n in rows)
+    items = [
+        NotificationOut(
+            id=n.id, saved_search_id=n.saved_search_id, post_id=n.post_id,
+            created_at=n.created_at, read_at=n.read_at,
+            post=PostOut.model_validate(p) if p is not None else None,
+        )
+        for n, p in zip(rows, posts)
+    ]
+    return NotificationPage(items=items, unread_count=unread)
+
+
+@router.post("/read")
+async def mark_notifications_read(up_to_id: int | None = Query(None, ge=1, description="defaults to all"),
+                                  db: AsyncSession = Depends(get_db),
+                                  user: CurrentUser = Depends(require_user)):
+    q = (
+        update(Notification)
+        .where(Notification.user_id == user.id, Notification.read_at.is_(None))
+        .values(read_at=func.now())
+    )
+    if up_to_id:
+        q = q.where(Notification.id <= up_to_id)
+    result = await db.execute(q)
+    await db.commit()
+    return {"updated": result.rowcount}
@@ -1,14 +1,74 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import select
+import re
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from pydantic import ValidationError
+from sqlalchemy import desc, func, insert, or_, select, text, tuple_
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm.exc import StaleDataError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.db import get_db
-from app.core.auth import require_user, CurrentUser
+from app.core.db import get_db, get_read_db, on_replica
+from app.core.auth import get_current_user, require_user, CurrentUser
+from app.core.events import queue_event
+from app.core.fastjson import dumps, json_response
+from app.core.loader import loader, parse_ids
 from app.models.post import Post
-from app.schemas.post import PostCreate, PostUpdate, PostOut
+from app.models.post_tombstone import PostTombstone
+from app.models.user import User
+from app.models.user_reputation import UserReputation
+from app.schemas.post import (
+    PostChanges, PostCreate, PostUpdate, PostOut, PostPage, PostNearbyOut, PostSuggestion,
+)
+from app.services.geo import cell_ranges, grid_cell, haversine_km_many
+from app.services.post_import import RecordError, iter_records
+from app.services.pagination import decode_cursor, decode_keyset_cursor, encode_cursor
+from app.services.saved_searches import notify_matches
+from app.services.suggest import MAX_SUGGESTIONS, title_changed, titles
+from app.services.post_cache import (
+    CachedBody,
+    body_etag,
+    generation,
+    invalidate_lists,
+    invalidate_post,
+    list_bodies,
+    post_bodies,
+    respond,
+    store,
+)
 
 router = APIRouter(prefix="/posts", tags=["posts"])
 
+DEFAULT_RADIUS_KM = 10.0
+MAX_RADIUS_KM = 100.0
+MAX_SEARCH_TERMS = 8
+IMPORT_BATCH_SIZE = 500
+MAX_IMPORT_ERRORS = 100
+
+# every transaction with an id below this has finished: rows stamped with one
+# are final, and anything still in flight will be stamped at or above it
+CHANGE_HORIZON_SQL = text("SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint")
+
+
+async def _commit_or_409(db: AsyncSession):
+    # the ORM's UPDATE/DELETE is guarded by the version it loaded; a purchase,
+    # another edit or a delete that committed in between makes it match no row
+    try:
+        await db.commit()
+    except StaleDataError:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail="Post was changed by someone else; reload and retry")
+
+
+def _active_title(post: Post) -> str | None:
+    # only active posts feed GET /posts/suggest
+    return post.title if post.status == "active" else None
+
+
+def _set_location(post: Post):
+    if (post.lat is None) != (post.lng is None):
+        raise HTTPException(status_code=422, detail="lat and lng must be set together")
+    post.geo_cell = grid_cell(post.lat, post.lng) if post.lat is not None else None
+
 
 @router.post("", response_model=PostOut)
 async def create_post(payload: PostCreate,
@@ -19,25 +79,382 @@ async def create_post(payload: PostCreate,
         title=payload.title,
         description=payload.description,
         price_cents=payload.price_cents,
+        lat=payload.lat,
+        lng=payload.lng,
     )
+    _set_location(post)
     db.add(post)
+    await db.flush()
+    await notify_matches(db, [post])
+    title_changed(db, post.id, 0, None, post.title)
+    queue_event(db, {"type": "post.created", "post_id": post.id})
     await db.commit()
+    invalidate_post(post.id)
     await db.refresh(post)
     return post
 
 
-@router.get("", response_model=list[PostOut])
-async def list_posts(db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(Post))
-    return list(result.scalars().all())
+async def _insert_import_batch(db: AsyncSession, rows: list[tuple[int, dict]], fail) -> list:
+    """Inserted rows' (id, seller_id, title, description, price_cents, lat, lng)."""
+    posts = Post.__table__
+    stmt = insert(posts).returning(
+        posts.c.id, posts.c.seller_id, posts.c.title, posts.c.description,
+        posts.c.price_cents, posts.c.lat, posts.c.lng,
+    )
+    try:
+        async with db.begin_nested():
+            return list(await db.execute(stmt, [r for _, r in rows]))
+    except DBAPIError:
+        pass
+
+    # something in the batch was rejected by the database: retry row by row to
+    # find out which, keeping the rest
+    inserted = []
+    for line, row in rows:
+        try:
+            async with db.begin_nested():
+                inserted.append((await db.execute(stmt, row)).one())
+        except DBAPIError as e:
+            # "<class 'asyncpg...'>: value too long ..." -> "value too long ..."
+            fail(line, str(e.orig).splitlines()[0].split(": ", 1)[-1])
+    return inserted
+
+
+@router.post("/import")
+async def import_posts(request: Request,
+                       db: AsyncSession = Depends(get_db),
+                       user: CurrentUser = Depends(require_user)):
+    """Bulk-create posts from an NDJSON (one PostCreate object per line) or CSV
+    (header row of PostCreate fields) body. Valid rows are inserted in batches
+    of IMPORT_BATCH_SIZE, each committed on its own; invalid rows are reported
+    by line number and skipped."""
+    records = iter_records(request.headers.get("content-type", ""), request.stream())
+    inserted = failed = 0
+    errors: list[dict] = []
+    batch: list[tuple[int, dict]] = []
+
+    def fail(line: int, message: str):
+        nonlocal failed
+        failed += 1
+        if len(errors) < MAX_IMPORT_ERRORS:
+            errors.append({"line": line, "error": message})
+
+    async def flush():
+        nonlocal inserted
+        if not batch:
+            return
+        rows = await _insert_import_batch(db, batch, fail)
+        batch.clear()
+        if rows:
+            await notify_matches(db, rows)
+            queue_event(db, {"type": "post.imported", "post_ids": [r.id for r in rows]})
+            for r in rows:
+                title_changed(db, r.id, 0, None, r.title)
+        await db.commit()
+        inserted += len(rows)
+
+    async for line, record in records:
+        if isinstance(record, RecordError):
+            fail(line, str(record))
+            continue
+        try:
+            payload = PostCreate.model_validate(record)
+        except ValidationError as e:
+            fail(line, "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors()))
+            continue
+        if (payload.lat is None) != (payload.lng is None):
+            fail(line, "lat and lng must be set together")
+            continue
+
+        batch.append((line, {
+            "seller_id": user.id,
+            "title": payload.title,
+            "description": payload.description,
+            "price_cents": payload.price_cents,
+            "status": "active",
+            "lat": payload.lat,
+            "lng": payload.lng,
+            "geo_cell": grid_cell(payload.lat, payload.lng) if payload.lat is not None else None,
+        }))
+        if len(batch) >= IMPORT_BATCH_SIZE:
+            await flush()
+    await flush()
+
+    if inserted:
+        invalidate_lists()
+    return {"inserted": inserted, "failed": failed, "errors": errors}
+
+
+def _apply_post_filters(q, status: str | None, min_price: int | None,
+                        max_price: int | None, seller_id: int | None):
+    if status is not None:
+        q = q.where(Post.status == status)
+    if min_price is not None:
+        q = q.where(Post.price_cents >= min_price)
+    if max_price is not None:
+        q = q.where(Post.price_cents <= max_price)
+    if seller_id is not None:
+        q = q.where(Post.seller_id == seller_id)
+    return q
+
+
+# exactly what PostOut needs, so list pages skip ORM objects and Pydantic:
+# rows become dicts in PostOut's shape and go straight to the JSON encoder
+def _select_post_rows():
+    rep = UserReputation
+    return select(
+        Post.id, Post.seller_id, Post.title, Post.description, Post.price_cents,
+        Post.status, Post.lat, Post.lng, Post.created_at,
+        rep.rating_count, rep.star_sum, rep.stars_1, rep.stars_2, rep.stars_3, rep.stars_4, rep.stars_5,
+        rep.last_rated_at,
+    ).outerjoin(rep, rep.user_id == Post.seller_id)
+
+
+def _post_dicts(rows) -> list[dict]:
+    return [
+        {
+            "id": r.id,
+            "seller_id": r.seller_id,
+            "title": r.title,
+            "description": r.description,
+            "price_cents": r.price_cents,
+            "status": r.status,
+            "lat": r.lat,
+            "lng": r.lng,
+            "created_at": r.created_at,
+            "seller_reputation": None if r.rating_count is None else {
+                "rating_count": r.rating_count,
+                "average_stars": round(r.star_sum / r.rating_count, 2) if r.rating_count else None,
+                "histogram": [r.stars_1, r.stars_2, r.stars_3, r.stars_4, r.stars_5],
+                "last_rated_at": r.last_rated_at,
+            },
+        }
+        for r in rows
+    ]
+
+
+@router.get("", response_model=PostPage)
+async def list_posts(request: Request,
+                     cursor: str | None = Query(None),
+                     limit: int = Query(20, ge=1, le=100),
+                     status: str | None = Query(None),
+                     min_price: int | None = Query(None, ge=0),
+                     max_price: int | None = Query(None, ge=0),
+                     seller_id: int | None = Query(None, ge=1),
+                     ids: str | None = Query(None, description="comma-separated post ids; returns just those, in that order"),
+                     db: AsyncSession = Depends(get_read_db)):
+    key = tuple(sorted(request.query_params.multi_items()))
+    cached = list_bodies.get(key)
+    if cached:
+        return respond(request, cached)
+    loaded_at = generation()
+
+    if ids is not None:
+        # hydrating a screen: one query for the lot, ids that don't exist are left out
+        posts = await loader(db, Post).load_many(parse_ids(ids))
+        page = PostPage(items=[PostOut.model_validate(p) for p in posts if p is not None])
+        body = page.model_dump_json().encode()
+        entry = CachedBody(body_etag(body), body)
+        store(list_bodies, key, entry, loaded_at, on_replica(db))
+        return respond(request, entry)
+
+    q = _apply_post_filters(_select_post_rows(), status, min_price, max_price, seller_id)
+
+    # keyset: newest first, continue strictly after the last row of the previous page
+    if cursor:
+        created_at, post_id = decode_keyset_cursor(cursor)
+        q = q.where(tuple_(Post.created_at, Post.id) < tuple_(created_at, post_id))
+
+    q = q.order_by(desc(Post.created_at), desc(Post.id)).limit(limit + 1)
+    rows = (await db.execute(q)).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+
+    body = dumps({"items": _post_dicts(rows), "next_cursor": next_cursor})
+    entry = CachedBody(body_etag(body), body)
+    store(list_bodies, key, entry, loaded_at, on_replica(db))
+    return respond(request, entry)
+
+
+def _prefix_tsquery(q: str) -> str | None:
+    # every term must match, the last one typed may be partial -> "desk:* & lamp:*"
+    terms = re.findall(r"\w+", q.lower())[:MAX_SEARCH_TERMS]
+    if not terms:
+        return None
+    return " & ".join(f"{t}:*" for t in terms)
+
+
+@router.get("/search", response_model=PostPage)
+async def search_posts(q: str = Query(..., min_length=1, max_length=200),
+                       cursor: str | None = Query(None),
+                       limit: int = Query(20, ge=1, le=100),
+                       status: str | None = Query("active"),
+                       min_price: int | None = Query(None, ge=0),
+                       max_price: int | None = Query(None, ge=0),
+                       seller_id: int | None = Query(None, ge=1),
+                       db: AsyncSession = Depends(get_read_db)):
+    tsquery = _prefix_tsquery(q)
+    if not tsquery:
+        raise HTTPException(status_code=422, detail="Search query has no searchable terms")
+
+    offset = 0
+    if cursor:
+        (offset,) = decode_cursor(cursor, 1)
+        if not isinstance(offset, int) or offset < 0:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    # GIN lookup on search_vector narrows to matches; rank only those
+    tsq = func.to_tsquery("english", tsquery)
+    rank = func.ts_rank_cd(Post.search_vector, tsq)
+    stmt = _apply_post_filters(
+        _select_post_rows().where(Post.search_vector.op("@@")(tsq)),
+        status, min_price, max_price, seller_id,
+    )
+    stmt = stmt.order_by(desc(rank), desc(Post.created_at), desc(Post.id)).offset(offset).limit(limit + 1)
+    rows = (await db.execute(stmt)).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(offset + limit)
+
+    return json_response({"items": _post_dicts(rows), "next_cursor": next_cursor})
+
+
+@router.get("/nearby", response_model=list[PostNearbyOut])
+async def nearby_posts(lat: float | None = Query(None, ge=-90, le=90),
+                       lng: float | None = Query(None, ge=-180, le=180),
+                       radius_km: float | None = Query(None, gt=0, le=MAX_RADIUS_KM),
+                       status: str | None = Query("active"),
+                       limit: int = Query(50, ge=1, le=200),
+                       db: AsyncSession = Depends(get_read_db),
+                       user: CurrentUser | None = Depends(get_current_user)):
+    # fall back to the caller's campus location / radius
+    if lat is None or lng is None or radius_km is None:
+        me = await db.get(User, user.id) if user else None
+        if lat is None and lng is None and me and me.campus_lat is not None:
+            lat, lng = me.campus_lat, me.campus_lng
+        if radius_km is None:
+            radius_km = min(me.default_radius_km, MAX_RADIUS_KM) if me else DEFAULT_RADIUS_KM
+    if lat is None or lng is None:
+        raise HTTPException(status_code=422, detail="lat and lng required (no campus location set)")
+
+    # 1) prune with the grid-cell index: only id + coordinates of nearby cells
+    cells = or_(*(Post.geo_cell.between(lo, hi) for lo, hi in cell_ranges(lat, lng, radius_km)))
+    q = select(Post.id, Post.lat, Post.lng).where(cells)
+    if status is not None:
+        q = q.where(Post.status == status)
+    candidates = (await db.execute(q)).all()
+    if not candidates:
+        return []
+
+    # 2) exact distances for every survivor in one vectorized pass
+    ids, lats, lngs = zip(*candidates)
+    dist = haversine_km_many(lat, lng, lats, lngs)
+    inside = (dist <= radius_km).nonzero()[0]
+    nearest = inside[dist[inside].argsort(kind="stable")[:limit]]
+    if not len(nearest):
+        return []
+
+    # 3) load full rows for just the page
+    by_id = {ids[i]: float(dist[i]) for i in nearest}
+    posts = (await db.execute(select(Post).where(Post.id.in_(by_id)))).scalars().all()
+    posts = sorted(posts, key=lambda p: by_id[p.id])
+    return [
+        PostNearbyOut(**PostOut.model_validate(p).model_dump(), distance_km=round(by_id[p.id], 3))
+        for p in posts
+    ]
+
+
+async def _changes(db: AsyncSession, after: tuple[int, int], horizon: int, limit: int) -> list[dict]:
+    """Up to `limit` changes keyed after `after` = (seq, id), below the horizon, in key order."""
+    live = (
+        _select_post_rows().add_columns(Post.change_seq)
+        .where(tuple_(Post.change_seq, Post.id) > after, Post.change_seq < horizon)
+        .order_by(Post.change_seq, Post.id).limit(limit)
+    )
+    gone = (
+        select(PostTombstone.post_id, PostTombstone.change_seq)
+        .where(tuple_(PostTombstone.change_seq, PostTombstone.post_id) > after, PostTombstone.change_seq < horizon)
+        .order_by(PostTombstone.change_seq, PostTombstone.post_id).limit(limit)
+    )
+    live_rows = (await db.execute(live)).all()
+    changes = [
+        {"seq": r.change_seq, "op": "upsert", "id": r.id, "post": post}
+        for r, post in zip(live_rows, _post_dicts(live_rows))
+    ]
+    changes += [
+        {"seq": r.change_seq, "op": "delete", "id": r.post_id, "post": None}
+        for r in (await db.execute(gone)).all()
+    ]
+    changes.sort(key=lambda c: (c["seq"], c["id"]))
+    return changes[:limit]
+
+
+@router.get("/suggest", response_model=list[PostSuggestion])
+async def suggest_posts(prefix: str = Query(..., min_length=1, max_length=100),
+                        limit: int = Query(8, ge=1, le=MAX_SUGGESTIONS)):
+    """Completions for the last word of `prefix` from the words in active post
+    titles, most used first. Answered from memory, so it can be called on
+    every keystroke."""
+    words = re.findall(r"\w+", prefix.lower())
+    if not words:
+        return json_response([])
+    return json_response([{"term": t, "posts": n} for t, n in titles.suggest(words[-1], limit)])
+
+
+@router.get("/changes", response_model=PostChanges)
+async def post_changes(since: str | None = Query(None, description="next_since from the previous call; omit for a full sync"),
+                       limit: int = Query(500, ge=1, le=1000),
+                       db: AsyncSession = Depends(get_db)):
+    """Posts created, edited, sold or deleted since the last sync, oldest
+    first, for clients that keep a local mirror. `seq` is the id of the
+    writing transaction; only finished transactions are reported, so a
+    slow writer can never commit "behind" a client's next_since. Pages are
+    keyed on (seq, id), so one big transaction (a migration, an import
+    batch) spreads over as many pages as it needs.
+    Always on the primary: a lagging replica could hand out a horizon the
+    client's cursor has already passed."""
+    after = (0, 0)
+    if since:
+        seq, post_id = decode_cursor(since, 2)
+        if not isinstance(seq, int) or not isinstance(post_id, int):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        after = (seq, post_id)
+
+    horizon = (await db.execute(CHANGE_HORIZON_SQL)).scalar_one()
+    changes = await _changes(db, after, horizon, limit + 1)
+    if len(changes) > limit:
+        page = changes[:limit]
+        last = page[-1]
+        return json_response({"changes": page, "next_since": encode_cursor(last["seq"], last["id"]), "has_more": True})
+
+    # caught up: next time start at the horizon (ids are >= 1, so (horizon, 0) precedes them all)
+    if horizon > after[0]:
+        after = (horizon, 0)
+    return json_response({"changes": changes, "next_since": encode_cursor(*after), "has_more": False})
 
 
 @router.get("/{post_id}", response_model=PostOut)
-async def get_post(post_id: int, db: AsyncSession = Depends(get_db)):
+async def get_post(post_id: int, request: Request, db: AsyncSession = Depends(get_read_db)):
+    cached = post_bodies.get(post_id)
+    if cached:
+        return respond(request, cached)
+    loaded_at = generation()
+
     post = await db.get(Post, post_id)
     if not post:
         raise HTTPException(status_code=404)
-    return post
+
+    # hash of the body, not the post version: the embedded seller reputation
+    # changes without touching the post
+    body = PostOut.model_validate(post).model_dump_json().encode()
+    entry = CachedBody(body_etag(body), body)
+    store(post_bodies, post_id, entry, loaded_at, on_replica(db))
+    return respond(request, entry)
 
 
 @router.patch("/{post_id}", response_model=PostOut)
@@ -52,10 +469,17 @@ async def update_post(post_id: int,
     if post.seller_id != user.id:
         raise HTTPException(status_code=403)
 
-    for field, value in payload.model_dump(exclude_unset=True).items():
+    version, old_title = post.version, _active_title(post)
+    changes = payload.model_dump(exclude_unset=True)
+    for field, value in changes.items():
         setattr(post, field, value)
+    if "lat" in changes or "lng" in changes:
+        _set_location(post)
 
-    await db.commit()
+    title_changed(db, post.id, version, old_title, _active_title(post))
+    queue_event(db, {"type": "post.updated", "post_id": post.id})
+    await _commit_or_409(db)
+    invalidate_post(post.id)
     await db.refresh(post)
     return post
 
@@ -71,6 +495,9 @@ async def delete_post(post_id: int,
     if post.seller_id != user.id:
         raise HTTPException(status_code=403)
 
+    title_changed(db, post_id, post.version, _active_title(post), None)
     await db.delete(post)
-    await db.commit()
+    queue_event(db, {"type": "post.deleted", "post_id": post_id})
+    await _commit_or_409(db)
+    invalidate_post(post_id)
     return {"success": True}
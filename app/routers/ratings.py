@@ -1,9 +1,14 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.db import get_db
+from app.core.events import queue_event
 from app.models.rating import Rating
+from app.models.transaction import Transaction
 from app.schemas.rating import RatingCreate, RatingOut
+from app.services.post_cache import invalidate_post
+from app.services.reputation import record_rating
 from app.core.auth import require_user, CurrentUser
 
 router = APIRouter(prefix="/ratings", tags=["ratings"])
@@ -13,14 +18,31 @@ router = APIRouter(prefix="/ratings", tags=["ratings"])
 async def create_rating(payload: RatingCreate,
                         db: AsyncSession = Depends(get_db),
                         user: CurrentUser = Depends(require_user)):
+    tx = await db.get(Transaction, payload.transaction_id)
+    if not tx:
+        raise HTTPException(status_code=404, detail="Transaction not found")
+    if user.id not in (tx.buyer_id, tx.seller_id):
+        raise HTTPException(status_code=403, detail="Not allowed")
+
+    # each side rates the other
+    ratee_id = tx.seller_id if user.id == tx.buyer_id else tx.buyer_id
     rating = Rating(
-        transaction_id=payload.transaction_id,
+        transaction_id=tx.id,
         rater_id=user.id,
-        ratee_id=user.id,  # simplify for now
+        ratee_id=ratee_id,
         stars=payload.stars,
         comment=payload.comment,
     )
     db.add(rating)
+    try:
+        await db.flush()
+    except IntegrityError:
+        # uq_ratings_transaction_rater: this side already rated this purchase
+        await db.rollback()
+        raise HTTPException(status_code=409, detail="You already rated this transaction")
+    await record_rating(db, ratee_id, payload.stars)
+    queue_event(db, {"type": "reputation.updated", "user_id": ratee_id})
     await db.commit()
-    await db.refresh(rating)
+    # this worker's cached post bodies carry the old reputation
+    invalidate_post()
     return rating
@@ -0,0 +1,72 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import desc, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.db import get_db, get_read_db
+from app.core.auth import CurrentUser, require_user
+from app.core.events import queue_event
+from app.models.saved_search import SavedSearch
+from app.schemas.saved_search import SavedSearchCreate, SavedSearchOut
+from app.services import saved_searches
+
+router = APIRouter(prefix="/saved-searches", tags=["saved-searches"])
+
+MAX_SAVED_SEARCHES = 20
+
+
+@router.post("", response_model=SavedSearchOut)
+async def create_saved_search(payload: SavedSearchCreate,
+                              db: AsyncSession = Depends(get_db),
+                              user: CurrentUser = Depends(require_user)):
+    """Get a notification whenever someone lists a post that matches."""
+    if len({payload.lat is None, payload.lng is None, payload.radius_km is None}) > 1:
+        raise HTTPException(status_code=422, detail="lat, lng and radius_km must be set together")
+    if payload.min_price_cents is not None and payload.max_price_cents is not None \
+            and payload.min_price_cents > payload.max_price_cents:
+        raise HTTPException(status_code=422, detail="min_price_cents is above max_price_cents")
+    if not saved_searches.words(payload.keywords) and payload.max_price_cents is None \
+            and payload.radius_km is None:
+        # would match nearly every new post
+        raise HTTPException(status_code=422, detail="Give keywords, a max price or a radius")
+
+    count = (await db.execute(
+        select(func.count()).select_from(SavedSearch).where(SavedSearch.user_id == user.id)
+    )).scalar_one()
+    if count >= MAX_SAVED_SEARCHES:
+        raise HTTPException(status_code=409, detail=f"At most {MAX_SAVED_SEARCHES} saved searches")
+
+    search = SavedSearch(user_id=user.id, **payload.model_dump())
+    db.add(search)
+    await db.flush()
+    event = saved_searches.created_event(search)
+    queue_event(db, event)
+    await db.commit()
+    saved_searches.apply(event)
+    await db.refresh(search)
+    return search
+
+
+@router.get("", response_model=list[SavedSearchOut])
+async def list_saved_searches(db: AsyncSession = Depends(get_read_db),
+                              user: CurrentUser = Depends(require_user)):
+    q = select(SavedSearch).where(SavedSearch.user_id == user.id).order_by(desc(SavedSearch.id))
+    return (await db.execute(q)).scalars().all()
+
+
+@router.delete("/{search_id}")
+async def delete_saved_search(search_id: int,
+                              db: AsyncSession = Depends(get_db),
+                              user: CurrentUser = Depends(require_user)):
+    search = await db.get(SavedSearch, search_id)
+    if not search:
+        raise HTTPException(status_code=404)
+
+    if search.user_id != user.id:
+        raise HTTPException(status_code=403)
+
+    await db.delete(search)
+    event = saved_searches.deleted_event(search_id)
+    queue_event(db, event)
+    await db.commit()
+    saved_searches.apply(event)
+    return {"success": True}
@@ -1,24 +1,92 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.db import get_db
-from app.models.transaction import Transaction
+from app.core.events import queue_event
 from app.core.auth import require_user, CurrentUser
+from app.services.post_cache import invalidate_post
+from app.services.suggest import title_changed
 
 router = APIRouter(prefix="/transactions", tags=["transactions"])
 
+# one round trip for winners and losers alike:
+# - `reserved` flips the post to sold only if it is still active and nobody
+#   else holds its row lock; SKIP LOCKED makes concurrent buyers give up at
+#   once instead of queueing behind the winner's commit
+# - `tx` creates the transaction from the reserved row, so the seller comes
+#   from the post, not the client
+# - `target` (same snapshot, no lock) tells losers why they lost, and gives
+#   the winner the title that leaves GET /posts/suggest
+PURCHASE_SQL = text("""
+    WITH target AS (
+        SELECT id, seller_id, status, title, version FROM posts WHERE id = :post_id
+    ), reserved AS (
+        UPDATE posts
+        SET status = 'sold', version = version + 1, updated_at = now()
+        WHERE id = (
+            SELECT id FROM posts
+            WHERE id = :post_id AND status = 'active' AND seller_id <> :buyer_id
+            FOR UPDATE SKIP LOCKED
+        )
+        RETURNING id, seller_id
+    ), tx AS (
+        INSERT INTO transactions (post_id, buyer_id, seller_id, status)
+        SELECT id, :buyer_id, seller_id, 'pending' FROM reserved
+        RETURNING id, post_id, buyer_id, seller_id, status
+    )
+    SELECT target.seller_id AS post_seller_id, target.title AS post_title,
+           target.version AS post_version, tx.*
+    FROM target LEFT JOIN tx ON true
+""")
+
+
+async def _purchase(db: AsyncSession, post_id: int, user: CurrentUser, seller_id: int | None = None) -> dict:
+    try:
+        row = (await db.execute(PURCHASE_SQL, {"post_id": post_id, "buyer_id": user.id})).one_or_none()
+    except IntegrityError:
+        # ux_transactions_post_id: the post was sold before and later set back to active
+        await db.rollback()
+        raise HTTPException(status_code=409, detail="Post is no longer available")
+    if row is None:
+        raise HTTPException(status_code=404, detail="Post not found")
+    if seller_id is not None and seller_id != row.post_seller_id:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="seller_id is not the post's seller")
+    if row.id is None:
+        await db.rollback()
+        if row.post_seller_id == user.id:
+            raise HTTPException(status_code=400, detail="Cannot buy your own post")
+        raise HTTPException(status_code=409, detail="Post is no longer available")
+
+    title_changed(db, post_id, row.post_version, row.post_title, None)
+    queue_event(db, {"type": "post.updated", "post_id": post_id})
+    await db.commit()
+    invalidate_post(post_id)
+    return {
+        "id": row.id,
+        "post_id": row.post_id,
+        "buyer_id": row.buyer_id,
+        "seller_id": row.seller_id,
+        "status": row.status,
+    }
+
 
 @router.post("")
 async def create_transaction(post_id: int,
                              seller_id: int,
                              db: AsyncSession = Depends(get_db),
                              user: CurrentUser = Depends(require_user)):
-    tx = Transaction(
-        post_id=post_id,
-        buyer_id=user.id,
-        seller_id=seller_id,
-    )
-    db.add(tx)
-    await db.commit()
-    await db.refresh(tx)
-    return tx
+    """Same as /purchase; kept for older clients. seller_id must match the post."""
+    return await _purchase(db, post_id, user, seller_id)
+
+
+@router.post("/purchase")
+async def purchase(post_id: int,
+                   db: AsyncSession = Depends(get_db),
+                   user: CurrentUser = Depends(require_user)):
+    """Buy an active post: marks it sold and opens a pending transaction
+    with its seller, atomically. Exactly one of any number of concurrent
+    buyers wins; the rest get 409 without waiting for the winner."""
+    return await _purchase(db, post_id, user)
@@ -0,0 +1,18 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.db import get_read_db
+from app.core.loader import loader, parse_ids
+from app.models.user import User
+from app.schemas.user import UserPublicOut
+
+router = APIRouter(prefix="/users", tags=["users"])
+
+
+@router.get("", response_model=list[UserPublicOut])
+async def get_users(ids: str = Query(..., description="comma-separated user ids"),
+                    db: AsyncSession = Depends(get_read_db)):
+    """Public profiles for up to 100 users in one round trip, in the order
+    asked for; ids that don't exist are left out."""
+    users = await loader(db, User).load_many(parse_ids(ids))
+    return [u for u in users if u is not None]
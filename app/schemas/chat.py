@@ -1,11 +1,15 @@
 from datetime import datetime
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class ConversationCreateIn(BaseModel):
     post_id: int
 
 
+class MarkReadIn(BaseModel):
+    conversation_ids: list[int] = Field(..., min_length=1, max_length=200)
+
+
 class MessageCreateIn(BaseModel):
     body: str
 
@@ -36,3 +40,8 @@ class ConversationOut(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class ConversationPage(BaseModel):
+    items: list[ConversationOut]
+    next_cursor: str | None = None
@@ -1,10 +1,17 @@
-from pydantic import BaseModel
+from datetime import datetime
+from typing import Literal
+
+from pydantic import BaseModel, Field
+
+from app.schemas.reputation import ReputationOut
 
 
 class PostCreate(BaseModel):
     title: str
     description: str | None = None
     price_cents: int
+    lat: float | None = Field(None, ge=-90, le=90)
+    lng: float | None = Field(None, ge=-180, le=180)
 
 
 class PostUpdate(BaseModel):
@@ -12,6 +19,8 @@ class PostUpdate(BaseModel):
     description: str | None = None
     price_cents: int | None = None
     status: str | None = None
+    lat: float | None = Field(None, ge=-90, le=90)
+    lng: float | None = Field(None, ge=-180, le=180)
 
 
 class PostOut(BaseModel):
@@ -21,6 +30,38 @@ class PostOut(BaseModel):
     description: str | None
     price_cents: int
     status: str
+    lat: float | None = None
+    lng: float | None = None
+    created_at: datetime
+    seller_reputation: ReputationOut | None = None
 
     class Config:
         from_attributes = True
+
+
+class PostPage(BaseModel):
+    items: list[PostOut]
+    next_cursor: str | None = None
+
+
+class PostNearbyOut(PostOut):
+    distance_km: float
+
+
+class PostSuggestion(BaseModel):
+    term: str
+    posts: int  # active posts with the word in their title
+
+
+class PostChange(BaseModel):
+    seq: int
+    op: Literal["upsert", "delete"]
+    id: int
+    post: PostOut | None = None  # the post as it is now; None for deletes
+
+
+class PostChanges(BaseModel):
+    changes: list[PostChange]
+    # opaque (seq, id) cursor: pass back as ?since= to get what changed after this page
+    next_since: str
+    has_more: bool
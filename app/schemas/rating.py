@@ -1,15 +1,16 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class RatingCreate(BaseModel):
     transaction_id: int
-    stars: int
+    stars: int = Field(..., ge=1, le=5)
     comment: str | None = None
 
 
 class RatingOut(BaseModel):
     id: int
     transaction_id: int
+    ratee_id: int
     stars: int
     comment: str | None
 
@@ -0,0 +1,13 @@
+from datetime import datetime
+
+from pydantic import BaseModel
+
+
+class ReputationOut(BaseModel):
+    rating_count: int
+    average_stars: float | None
+    histogram: list[int]  # number of 1, 2, 3, 4 and 5 star ratings
+    last_rated_at: datetime | None
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,44 @@
+from datetime import datetime
+
+from pydantic import BaseModel, Field
+
+from app.schemas.post import PostOut
+
+
+class SavedSearchCreate(BaseModel):
+    name: str | None = Field(None, max_length=80)
+    keywords: str | None = Field(None, max_length=200)
+    min_price_cents: int | None = Field(None, ge=0)
+    max_price_cents: int | None = Field(None, ge=0)
+    lat: float | None = Field(None, ge=-90, le=90)
+    lng: float | None = Field(None, ge=-180, le=180)
+    radius_km: float | None = Field(None, gt=0, le=100)
+
+
+class SavedSearchOut(BaseModel):
+    id: int
+    name: str | None
+    keywords: str | None
+    min_price_cents: int | None
+    max_price_cents: int | None
+    lat: float | None
+    lng: float | None
+    radius_km: float | None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class NotificationOut(BaseModel):
+    id: int
+    saved_search_id: int
+    post_id: int
+    created_at: datetime
+    read_at: datetime | None
+    post: PostOut | None = None
+
+
+class NotificationPage(BaseModel):
+    items: list[NotificationOut]
+    unread_count: int
@@ -1,9 +1,24 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field, field_validator
+
+from app.schemas.reputation import ReputationOut
 
 class UserOut(BaseModel):
     id: int
     email: EmailStr
     name: str
+    campus_lat: float | None = None
+    campus_lng: float | None = None
+    default_radius_km: float = 10.0
+    reputation: ReputationOut | None = None
+
+    class Config:
+        from_attributes = True
+
+class UserPublicOut(BaseModel):
+    """What anyone may see about another user (no email or location)."""
+    id: int
+    name: str
+    reputation: ReputationOut | None = None
 
     class Config:
         from_attributes = True
@@ -12,6 +27,23 @@ class SignupIn(BaseModel):
     email: EmailStr
     name: str
     password: str
+    campus_lat: float | None = Field(None, ge=-90, le=90)
+    campus_lng: float | None = Field(None, ge=-180, le=180)
+    default_radius_km: float = Field(10.0, gt=0, le=500)
+
+class UserUpdate(BaseModel):
+    name: str | None = None
+    campus_lat: float | None = Field(None, ge=-90, le=90)
+    campus_lng: float | None = Field(None, ge=-180, le=180)
+    default_radius_km: float | None = Field(None, gt=0, le=500)
+
+    # may be left out, but not cleared: the columns are NOT NULL
+    @field_validator("name", "default_radius_km")
+    @classmethod
+    def not_null(cls, v):
+        if v is None:
+            raise ValueError("may not be null")
+        return v
 
 class LoginIn(BaseModel):
     email: EmailStr
@@ -0,0 +1,125 @@
+"""Denormalized inbox state: Conversation.last_message_* and ConversationRead.unread_count.
+
+Writers call record_messages() inside the transaction that inserts the
+messages; rebuild_counters() recomputes everything from `messages`:
+
+    python -m app.services.chat_counters
+"""
+import asyncio
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime
+
+from sqlalchemy import bindparam, func, or_, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.conversation import Conversation
+
+
+@dataclass
+class NewMessage:
+    conversation_id: int
+    message_id: int
+    created_at: datetime
+    recipient_id: int
+
+
+# arrays instead of a multi-row VALUES so the statement text (and its cached
+# compilation / prepared statement) is the same for any batch size
+BUMP_UNREAD_SQL = text("""
+    INSERT INTO conversation_reads (conversation_id, user_id, unread_count)
+    SELECT * FROM unnest(CAST(:conversation_ids AS bigint[]), CAST(:user_ids AS bigint[]), CAST(:counts AS integer[]))
+    ON CONFLICT (conversation_id, user_id)
+    DO UPDATE SET unread_count = conversation_reads.unread_count + EXCLUDED.unread_count
+""")
+
+
+async def record_messages(db: AsyncSession, messages: list[NewMessage]):
+    """Advance last_message_* once per conversation and bump each recipient's unread counter."""
+    if not messages:
+        return
+
+    latest: dict[int, NewMessage] = {}
+    for m in messages:
+        cur = latest.get(m.conversation_id)
+        if cur is None or m.message_id > cur.message_id:
+            latest[m.conversation_id] = m
+
+    # rows are touched in id order so concurrent multi-conversation batches
+    # can't lock each other in opposite orders; never move last_message_id
+    # backwards if a concurrent writer got there first
+    conversations = Conversation.__table__
+    await db.execute(
+        update(conversations)
+        .where(conversations.c.id == bindparam("conv_id"))
+        .where(or_(conversations.c.last_message_id.is_(None),
+                   conversations.c.last_message_id < bindparam("msg_id")))
+        .values(last_message_id=bindparam("msg_id"),
+                last_message_at=bindparam("msg_at"),
+                updated_at=func.now()),
+        [{"conv_id": m.conversation_id, "msg_id": m.message_id, "msg_at": m.created_at}
+         for _, m in sorted(latest.items())],
+    )
+
+    unread = sorted(Counter((m.conversation_id, m.recipient_id) for m in messages).items())
+    await db.execute(BUMP_UNREAD_SQL, {
+        "conversation_ids": [conv_id for (conv_id, _), _ in unread],
+        "user_ids": [user_id for (_, user_id), _ in unread],
+        "counts": [n for _, n in unread],
+    })
+
+
+REBUILD_SQL = [
+    # last message per conversation (NULL when a thread has none)
+    """
+    UPDATE conversations c
+    SET last_message_id = m.id, last_message_at = m.created_at
+    FROM (
+        SELECT DISTINCT ON (conversation_id) conversation_id, id, created_at
+        FROM messages
+        ORDER BY conversation_id, id DESC
+    ) m
+    WHERE m.conversation_id = c.id
+      AND c.last_message_id IS DISTINCT FROM m.id
+    """,
+    """
+    UPDATE conversations c
+    SET last_message_id = NULL, last_message_at = NULL
+    WHERE c.last_message_id IS NOT NULL
+      AND NOT EXISTS (SELECT 1 FROM messages m WHERE m.conversation_id = c.id)
+    """,
+    # unread per participant = messages from the other side past their read marker
+    """
+    INSERT INTO conversation_reads (conversation_id, user_id, unread_count)
+    SELECT c.id, p.user_id, count(m.id)
+    FROM conversations c
+    CROSS JOIN LATERAL (VALUES (c.buyer_id), (c.seller_id)) AS p(user_id)
+    LEFT JOIN conversation_reads r
+      ON r.conversation_id = c.id AND r.user_id = p.user_id
+    LEFT JOIN messages m
+      ON m.conversation_id = c.id
+     AND m.sender_id <> p.user_id
+     AND m.id > coalesce(r.last_read_message_id, 0)
+    GROUP BY c.id, p.user_id
+    ON CONFLICT (conversation_id, user_id)
+    DO UPDATE SET unread_count = EXCLUDED.unread_count
+    """,
+]
+
+
+async def rebuild_counters(db: AsyncSession):
+    for sql in REBUILD_SQL:
+        await db.execute(text(sql))
+    await db.commit()
+
+
+async def _main():
+    from app.core.db import SessionLocal
+
+    async with SessionLocal() as db:
+        await rebuild_counters(db)
+    print("chat counters rebuilt")
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
@@ -0,0 +1,154 @@
+import asyncio
+import json
+import time
+from collections import defaultdict
+
+from fastapi import WebSocket, WebSocketDisconnect
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.core.db import SessionLocal
+from app.core.events import bus
+from app.models.message import Message
+from app.schemas.chat import MessageOut
+
+PING = json.dumps({"type": "ping"})
+PONG = json.dumps({"type": "pong"})
+
+# close codes: 1001 going away (missed heartbeats), 1013 try again later (fell behind)
+CLOSE_IDLE = 1001
+CLOSE_LAGGING = 1013
+
+
+class Connection:
+    def __init__(self, websocket: WebSocket, user_id: int, queue_size: int):
+        self.websocket = websocket
+        self.user_id = user_id
+        self.outbox: asyncio.Queue[str] = asyncio.Queue(maxsize=queue_size)
+        self.kicked = asyncio.Event()
+        self.close_code = 1000
+        self.last_seen = time.monotonic()
+
+
+class ChatHub:
+    """Fans chat events out to every socket a user has open on this worker.
+
+    Each socket gets a bounded outbox drained by its own sender task, so one slow
+    client never blocks publish(); a client that lets its outbox fill up is
+    disconnected and is expected to reconnect and catch up over REST.
+    """
+
+    def __init__(self, queue_size: int, heartbeat_seconds: float):
+        self.queue_size = queue_size
+        self.heartbeat_seconds = heartbeat_seconds
+        self._by_user: dict[int, set[Connection]] = defaultdict(set)
+        self._heartbeat_task: asyncio.Task | None = None
+        self.dropped = 0
+
+    @property
+    def connection_count(self) -> int:
+        return sum(len(c) for c in self._by_user.values())
+
+    def publish(self, user_ids, event: dict):
+        data = json.dumps(event, default=str)  # encode once for every recipient
+        for user_id in set(user_ids):
+            for conn in list(self._by_user.get(user_id, ())):
+                try:
+                    conn.outbox.put_nowait(data)
+                except asyncio.QueueFull:
+                    self.dropped += 1
+                    self._kick(conn, CLOSE_LAGGING)
+
+    async def serve(self, websocket: WebSocket, user_id: int):
+        """Run an accepted socket until it disconnects, lags or stops answering pings."""
+        conn = Connection(websocket, user_id, self.queue_size)
+        self._by_user[user_id].add(conn)
+        if self._heartbeat_task is None or self._heartbeat_task.done():
+            self._heartbeat_task = asyncio.create_task(self._heartbeat_loop())
+
+        tasks = [
+            asyncio.create_task(self._send_loop(conn)),
+            asyncio.create_task(self._receive_loop(conn)),
+            asyncio.create_task(conn.kicked.wait()),
+        ]
+        try:
+            await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for t in tasks:
+                t.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self._unregister(conn)
+            try:
+                await websocket.close(code=conn.close_code)
+            except RuntimeError:
+                pass  # already closed by the client
+
+    def _kick(self, conn: Connection, code: int):
+        conn.close_code = code
+        conn.kicked.set()
+        self._unregister(conn)
+
+    def _unregister(self, conn: Connection):
+        conns = self._by_user.get(conn.user_id)
+        if conns is None:
+            return
+        conns.discard(conn)
+        if not conns:
+            del self._by_user[conn.user_id]
+
+    async def _heartbeat_loop(self):
+        # one ticker for every socket instead of a timer per connection
+        while self._by_user:
+            await asyncio.sleep(self.heartbeat_seconds)
+            deadline = time.monotonic() - 2 * self.heartbeat_seconds
+            for conns in list(self._by_user.values()):
+                for conn in list(conns):
+                    if conn.last_seen < deadline:
+                        self._kick(conn, CLOSE_IDLE)
+                    else:
+                        try:
+                            conn.outbox.put_nowait(PING)
+                        except asyncio.QueueFull:
+                            pass  # already lagging; publish() will kick it
+
+    async def _send_loop(self, conn: Connection):
+        while True:
+            data = await conn.outbox.get()
+            await conn.websocket.send_text(data)
+
+    async def _receive_loop(self, conn: Connection):
+        try:
+            while True:
+                text = await conn.websocket.receive_text()
+                conn.last_seen = time.monotonic()
+                if text == "ping" or text == PING:
+                    try:
+                        conn.outbox.put_nowait(PONG)
+                    except asyncio.QueueFull:
+                        pass
+        except WebSocketDisconnect:
+            return
+
+
+hub = ChatHub(settings.CHAT_WS_QUEUE_SIZE, settings.CHAT_WS_HEARTBEAT_SECONDS)
+
+
+async def _deliver_message_events(events: list[dict]):
+    # events only carry ids; load the whole batch's messages in one query
+    recipients = {e["message_id"]: e["recipients"] for e in events if e["type"] == "message.created"}
+    if not recipients or not hub.connection_count:
+        return
+    async with SessionLocal() as db:
+        rows = (await db.execute(select(Message).where(Message.id.in_(recipients)))).scalars().all()
+    for msg in sorted(rows, key=lambda m: m.id):
+        out = MessageOut.model_validate(msg)
+        hub.publish(recipients[msg.id], {"type": "message.created", "message": out.model_dump(mode="json")})
+
+
+async def _deliver_read_events(events: list[dict]):
+    for e in events:
+        hub.publish(e["recipients"], {k: v for k, v in e.items() if k != "recipients"})
+
+
+bus.subscribe("message.", _deliver_message_events)
+bus.subscribe("read.", _deliver_read_events)
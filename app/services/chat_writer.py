@@ -0,0 +1,151 @@
+"""Group commit for chat messages (settings.CHAT_GROUP_COMMIT).
+
+send_message hands each validated message to `writer.submit()` and awaits the
+returned future. A single flusher task waits CHAT_GROUP_COMMIT_WINDOW_MS after
+the first message of a batch, then writes everything queued by then in one
+transaction: one multi-row INSERT ... RETURNING, one record_messages() (each
+conversation bumped once), one commit. While a batch is being written the next
+one accumulates, so batches grow with load instead of commits queueing up.
+"""
+import asyncio
+from dataclasses import dataclass
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.db import SessionLocal
+from app.core.events import queue_event
+from app.schemas.chat import MessageOut
+from app.services.chat_counters import NewMessage, record_messages
+
+# ORDER BY ordinality makes the serial ids ascend in submission order, so
+# sorting RETURNING by id lines rows up with the batch
+INSERT_MESSAGES_SQL = text("""
+    INSERT INTO messages (conversation_id, sender_id, body)
+    SELECT conversation_id, sender_id, body
+    FROM unnest(CAST(:conversation_ids AS bigint[]), CAST(:sender_ids AS bigint[]), CAST(:bodies AS text[]))
+         WITH ORDINALITY AS m(conversation_id, sender_id, body, n)
+    ORDER BY n
+    RETURNING id, conversation_id, sender_id, body, created_at
+""")
+
+
+@dataclass
+class PendingMessage:
+    conversation_id: int
+    sender_id: int
+    recipient_id: int
+    body: str
+
+
+class GroupCommitWriter:
+    def __init__(self, window_ms: float, max_batch: int):
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self._queue: asyncio.Queue | None = None
+        self._task: asyncio.Task | None = None
+        self._batch: list = []  # taken off the queue, not answered yet
+        self.batches = 0
+        self.messages = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    async def start(self):
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        # the batch the flusher was holding (it may or may not have committed)
+        # and whatever was still queued
+        pending = self._batch
+        while self._queue and not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        for _, fut in pending:
+            if not fut.done():
+                fut.set_exception(RuntimeError("chat writer stopped"))
+        self._batch = []
+        self._queue = None
+
+    def submit(self, msg: PendingMessage) -> asyncio.Future:
+        fut = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((msg, fut))
+        return fut
+
+    async def _run(self):
+        while True:
+            self._batch = batch = [await self._queue.get()]
+            if self.window:
+                await asyncio.sleep(self.window)
+            while len(batch) < self.max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+
+            try:
+                saved = await self._write([msg for msg, _ in batch])
+            except Exception as e:
+                if len(batch) == 1:
+                    saved = [e]
+                else:
+                    # one bad row (say a conversation deleted meanwhile) fails
+                    # the whole INSERT; write them one by one so only it fails
+                    saved = [await self._write_one(msg) for msg, _ in batch]
+
+            for (_, fut), out in zip(batch, saved):
+                if fut.done():  # the caller may have gone away
+                    continue
+                if isinstance(out, Exception):
+                    fut.set_exception(out)
+                else:
+                    fut.set_result(out)
+            self._batch = []
+
+    async def _write_one(self, msg: PendingMessage) -> MessageOut | Exception:
+        try:
+            return (await self._write([msg]))[0]
+        except Exception as e:
+            return e
+
+    async def _write(self, batch: list[PendingMessage]) -> list[MessageOut]:
+        async with SessionLocal() as db:
+            rows = (await db.execute(INSERT_MESSAGES_SQL, {
+                "conversation_ids": [m.conversation_id for m in batch],
+                "sender_ids": [m.sender_id for m in batch],
+                "bodies": [m.body for m in batch],
+            })).all()
+            rows.sort(key=lambda r: r.id)
+
+            await record_messages(db, [
+                NewMessage(r.conversation_id, r.id, r.created_at, m.recipient_id)
+                for m, r in zip(batch, rows)
+            ])
+            for m, r in zip(batch, rows):
+                queue_event(db, {
+                    "type": "message.created",
+                    "conversation_id": r.conversation_id,
+                    "message_id": r.id,
+                    "recipients": [m.sender_id, m.recipient_id],
+                })
+            await db.commit()
+
+        self.batches += 1
+        self.messages += len(batch)
+        return [MessageOut.model_validate(r) for r in rows]
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "messages": self.messages,
+            "avg_batch": round(self.messages / self.batches, 2) if self.batches else None,
+            "queued": self._queue.qsize() if self._queue else 0,
+        }
+
+
+writer = GroupCommitWriter(settings.CHAT_GROUP_COMMIT_WINDOW_MS, settings.CHAT_GROUP_COMMIT_MAX_BATCH)
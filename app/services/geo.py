@@ -1,8 +1,20 @@
 import math
 
+import numpy as np
+
+EARTH_RADIUS_KM = 6371
+KM_PER_DEG_LAT = math.pi * EARTH_RADIUS_KM / 180  # same sphere as haversine_km
+
+# grid cells are CELL_DEG x CELL_DEG (~5.5 km tall), numbered row-major so that
+# neighbouring cells in a row are consecutive integers and a bounding box turns
+# into one integer range per row
+CELL_DEG = 0.05
+_ROWS = int(180 / CELL_DEG)
+_COLS = int(360 / CELL_DEG)
+
 
 def haversine_km(lat1, lng1, lat2, lng2):
-    R = 6371
+    R = EARTH_RADIUS_KM
     dlat = math.radians(lat2 - lat1)
     dlng = math.radians(lng2 - lng1)
 
@@ -13,3 +25,52 @@ def haversine_km(lat1, lng1, lat2, lng2):
         * math.sin(dlng / 2) ** 2
     )
     return 2 * R * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+
+def haversine_km_many(lat, lng, lats, lngs) -> np.ndarray:
+    """Distances from one point to many, computed in a single vectorized pass."""
+    lat1 = math.radians(lat)
+    lat2 = np.radians(np.asarray(lats, dtype=np.float64))
+    dlat = lat2 - lat1
+    dlng = np.radians(np.asarray(lngs, dtype=np.float64) - lng)
+
+    a = np.sin(dlat / 2) ** 2 + math.cos(lat1) * np.cos(lat2) * np.sin(dlng / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def _row(lat: float) -> int:
+    return min(max(int((lat + 90) / CELL_DEG), 0), _ROWS - 1)
+
+
+def _col(lng: float) -> int:
+    return int(math.floor((lng + 180) / CELL_DEG)) % _COLS
+
+
+def grid_cell(lat: float, lng: float) -> int:
+    return _row(lat) * _COLS + _col(lng)
+
+
+def cell_ranges(lat: float, lng: float, radius_km: float) -> list[tuple[int, int]]:
+    """Inclusive grid_cell ranges covering every point within radius_km of (lat, lng)."""
+    dlat = radius_km / KM_PER_DEG_LAT
+    lat_lo, lat_hi = lat - dlat, lat + dlat
+
+    # widest longitude span happens at the box edge closest to a pole
+    widest = max(abs(lat_lo), abs(lat_hi))
+    if widest >= 90:
+        dlng = 180.0
+    else:
+        dlng = radius_km / (KM_PER_DEG_LAT * math.cos(math.radians(widest)))
+
+    if dlng >= 180:
+        cols = [(0, _COLS - 1)]
+    else:
+        c0, c1 = _col(lng - dlng), _col(lng + dlng)
+        # wraps across the antimeridian -> two spans
+        cols = [(c0, c1)] if c0 <= c1 else [(c0, _COLS - 1), (0, c1)]
+
+    ranges = []
+    for row in range(_row(lat_lo), _row(lat_hi) + 1):
+        base = row * _COLS
+        ranges.extend((base + a, base + b) for a, b in cols)
+    return ranges
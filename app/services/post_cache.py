@@ -0,0 +1,104 @@
+"""Serialized GET /posts and /posts/{id} bodies, served with weak ETags.
+
+A hit costs neither a query nor JSON encoding, and a matching If-None-Match
+turns it into a bodiless 304. Writers call invalidate_post() after commit;
+other workers hear about it through post.* events on the bus. A read that
+loaded while an invalidation happened is returned but not stored.
+"""
+import hashlib
+import time
+from dataclasses import dataclass
+
+from fastapi import Request, Response
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.events import bus
+
+CACHE_CONTROL = f"public, max-age={settings.POST_HTTP_MAX_AGE_SECONDS}, must-revalidate"
+
+
+@dataclass(frozen=True)
+class CachedBody:
+    etag: str
+    body: bytes
+
+
+post_bodies = TTLCache(settings.POST_CACHE_SIZE, settings.POST_CACHE_TTL_SECONDS)
+list_bodies = TTLCache(settings.POST_LIST_CACHE_SIZE, settings.POST_CACHE_TTL_SECONDS)
+_generation = 0
+_invalidated_at = 0.0
+
+
+def generation() -> int:
+    return _generation
+
+
+def invalidate_lists():
+    global _generation, _invalidated_at
+    _generation += 1
+    _invalidated_at = time.monotonic()
+    list_bodies.clear()
+
+
+def invalidate_post(post_id: int | None = None):
+    if post_id is None:
+        post_bodies.clear()
+    else:
+        post_bodies.pop(post_id)
+    # any write can move a post in or out of any listing
+    invalidate_lists()
+
+
+def body_etag(body: bytes) -> str:
+    return f'W/"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+
+
+def store(cache: TTLCache, key, entry: CachedBody, loaded_at: int, from_replica: bool = False):
+    if loaded_at != _generation:
+        return
+    # a replica may not have the write behind a recent invalidation yet; don't
+    # let its copy outlive the lag
+    if from_replica and time.monotonic() - _invalidated_at < settings.DB_REPLICA_MAX_LAG_SECONDS:
+        return
+    cache.set(key, entry)
+
+
+def _not_modified(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # weak comparison (RFC 9110 13.1.2)
+    return etag.removeprefix("W/") in {t.strip().removeprefix("W/") for t in header.split(",")}
+
+
+def respond(request: Request, entry: CachedBody) -> Response:
+    headers = {"ETag": entry.etag, "Cache-Control": CACHE_CONTROL}
+    if _not_modified(request, entry.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(entry.body, media_type="application/json", headers=headers)
+
+
+async def _on_post_events(events: list[dict]):
+    for e in events:
+        if e["type"] == "post.imported":
+            invalidate_lists()
+        else:
+            invalidate_post(e["post_id"])
+
+
+async def _on_reputation_events(events: list[dict]):
+    # seller_reputation is embedded in post bodies; ratings are rare enough
+    # that dropping everything beats tracking which cached posts are whose
+    invalidate_post()
+
+
+async def _on_bus_reconnect(events: list[dict]):
+    invalidate_post()
+
+
+bus.subscribe("post.", _on_post_events)
+bus.subscribe("reputation.", _on_reputation_events)
+bus.subscribe("bus.reconnected", _on_bus_reconnect)
@@ -0,0 +1,125 @@
+"""Incremental NDJSON / CSV parsing for POST /posts/import.
+
+iter_records() consumes the request body chunk by chunk and yields
+(line_number, record_or_error) as soon as each record is complete, so memory
+is bounded by the longest record, not by the upload.
+"""
+import codecs
+import csv
+import json
+from typing import AsyncIterator
+
+from fastapi import HTTPException
+
+MAX_RECORD_BYTES = 64 * 1024
+CSV_COLUMNS = {"title", "description", "price_cents", "lat", "lng"}
+
+
+class RecordError(Exception):
+    pass
+
+
+def _decode(raw: bytes) -> str | RecordError:
+    try:
+        return raw.decode("utf-8")
+    except UnicodeDecodeError:
+        return RecordError("not valid UTF-8")
+
+
+async def _lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str | RecordError]:
+    """One item per line of the body. A line that isn't UTF-8 or is longer
+    than MAX_RECORD_BYTES comes back as a RecordError and the next line starts
+    fresh ("\n" never occurs inside a multi-byte UTF-8 sequence)."""
+    pending = b""
+    first, too_long = True, False
+    async for chunk in chunks:
+        *complete, pending = (pending + chunk).split(b"\n")
+        for raw in complete:
+            if first:
+                raw, first = raw.removeprefix(codecs.BOM_UTF8), False
+            if too_long:
+                too_long = False  # the end of a line already reported
+                continue
+            if len(raw) > MAX_RECORD_BYTES:
+                yield RecordError(f"line longer than {MAX_RECORD_BYTES} bytes")
+                continue
+            yield _decode(raw + b"\n")
+        if len(pending) > MAX_RECORD_BYTES:
+            # don't hold on to it; drop bytes until the next newline
+            if not too_long:
+                yield RecordError(f"line longer than {MAX_RECORD_BYTES} bytes")
+            pending, too_long = b"", True
+    if first:
+        pending = pending.removeprefix(codecs.BOM_UTF8)
+    if pending and not too_long:
+        yield _decode(pending)
+
+
+async def _ndjson(chunks) -> AsyncIterator[tuple[int, dict | RecordError]]:
+    n = 0
+    async for line in _lines(chunks):
+        n += 1
+        if isinstance(line, RecordError):
+            yield n, line
+            continue
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield n, RecordError(f"invalid JSON: {e}")
+            continue
+        yield n, record if isinstance(record, dict) else RecordError("expected a JSON object")
+
+
+async def _csv(chunks) -> AsyncIterator[tuple[int, dict | RecordError]]:
+    header = None
+    n, start, record = 0, 0, ""
+    async for line in _lines(chunks):
+        n += 1
+        if not record:
+            start = n
+        if isinstance(line, RecordError):
+            # drops a quoted record in progress too; the next line starts a new one
+            yield start, line
+            record = ""
+            continue
+        record += line
+        # a quoted field may span lines; the record is complete once quotes balance
+        if record.count('"') % 2:
+            if len(record.encode()) > MAX_RECORD_BYTES:
+                # no telling where this record ends, so nothing after it can be trusted
+                yield start, RecordError(f"record longer than {MAX_RECORD_BYTES} bytes; "
+                                         f"nothing from line {start} on was imported")
+                return
+            continue
+        text, record = record, ""
+        if not text.strip():
+            continue
+
+        row = next(csv.reader([text]))
+        if header is None:
+            header = [h.strip() for h in row]
+            unknown = set(header) - CSV_COLUMNS
+            if unknown or "title" not in header or "price_cents" not in header:
+                raise HTTPException(
+                    status_code=422,
+                    detail=f"CSV header must name title, price_cents and optionally description, lat, lng (got {header})",
+                )
+            continue
+        if len(row) != len(header):
+            yield start, RecordError(f"expected {len(header)} columns, got {len(row)}")
+            continue
+        # empty cells mean "not given"
+        yield start, {k: v for k, v in zip(header, row) if v != ""}
+
+    if record:
+        yield start, RecordError("unterminated quoted field")
+
+
+def iter_records(content_type: str, chunks: AsyncIterator[bytes]):
+    if "csv" in content_type:
+        return _csv(chunks)
+    if "ndjson" in content_type or "jsonl" in content_type:
+        return _ndjson(chunks)
+    raise HTTPException(status_code=415, detail="Send application/x-ndjson or text/csv")
@@ -0,0 +1,79 @@
+"""Seller reputation: UserReputation rows aggregated from `ratings`.
+
+create_rating calls record_rating() in the transaction that inserts the
+rating; rebuild_reputation() recomputes every row from scratch:
+
+    python -m app.services.reputation
+"""
+import asyncio
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+RECORD_RATING_SQL = text("""
+    INSERT INTO user_reputations AS r
+        (user_id, rating_count, star_sum, stars_1, stars_2, stars_3, stars_4, stars_5, last_rated_at)
+    VALUES (:user_id, 1, :stars,
+            (:stars = 1)::int, (:stars = 2)::int, (:stars = 3)::int, (:stars = 4)::int, (:stars = 5)::int,
+            now())
+    ON CONFLICT (user_id) DO UPDATE SET
+        rating_count = r.rating_count + 1,
+        star_sum = r.star_sum + EXCLUDED.star_sum,
+        stars_1 = r.stars_1 + EXCLUDED.stars_1,
+        stars_2 = r.stars_2 + EXCLUDED.stars_2,
+        stars_3 = r.stars_3 + EXCLUDED.stars_3,
+        stars_4 = r.stars_4 + EXCLUDED.stars_4,
+        stars_5 = r.stars_5 + EXCLUDED.stars_5,
+        last_rated_at = greatest(r.last_rated_at, EXCLUDED.last_rated_at)
+""")
+
+
+async def record_rating(db: AsyncSession, ratee_id: int, stars: int):
+    await db.execute(RECORD_RATING_SQL, {"user_id": ratee_id, "stars": stars})
+
+
+REBUILD_SQL = [
+    """
+    INSERT INTO user_reputations
+        (user_id, rating_count, star_sum, stars_1, stars_2, stars_3, stars_4, stars_5, last_rated_at)
+    SELECT ratee_id, count(*), sum(stars),
+           count(*) FILTER (WHERE stars = 1), count(*) FILTER (WHERE stars = 2),
+           count(*) FILTER (WHERE stars = 3), count(*) FILTER (WHERE stars = 4),
+           count(*) FILTER (WHERE stars = 5),
+           max(created_at)
+    FROM ratings
+    GROUP BY ratee_id
+    ON CONFLICT (user_id) DO UPDATE SET
+        rating_count = EXCLUDED.rating_count,
+        star_sum = EXCLUDED.star_sum,
+        stars_1 = EXCLUDED.stars_1,
+        stars_2 = EXCLUDED.stars_2,
+        stars_3 = EXCLUDED.stars_3,
+        stars_4 = EXCLUDED.stars_4,
+        stars_5 = EXCLUDED.stars_5,
+        last_rated_at = EXCLUDED.last_rated_at
+    """,
+    # users whose ratings are all gone
+    """
+    DELETE FROM user_reputations r
+    WHERE NOT EXISTS (SELECT 1 FROM ratings WHERE ratings.ratee_id = r.user_id)
+    """,
+]
+
+
+async def rebuild_reputation(db: AsyncSession):
+    for sql in REBUILD_SQL:
+        await db.execute(text(sql))
+    await db.commit()
+
+
+async def _main():
+    from app.core.db import SessionLocal
+
+    async with SessionLocal() as db:
+        await rebuild_reputation(db)
+    print("reputation rebuilt")
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
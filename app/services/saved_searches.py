@@ -0,0 +1,209 @@
+"""New-listing alerts: match each new post against the saved searches without
+re-running every one of them.
+
+Every worker keeps all saved searches in memory, indexed in reverse by
+(keyword, price bucket). A search is filed under its longest keyword (all of
+them must match, so any one will do, and long words are rarer) for each
+power-of-two price bucket its price range overlaps. Searches without keywords
+but with a radius are filed under (grid cell, None) for every geo.grid_cell
+their circle touches, unless that is more than MAX_SEARCH_CELLS cells (a radius
+over ~40 km); those, and searches with only a price, are filed under
+(None, bucket) and are checked against every post in their price range. A
+post only looks up (word, bucket of its price) for the words it contains,
+(None, bucket) and (its cell, None), and checks those candidates exactly.
+The work per post grows with the post's length and the number of searches
+sharing its words or its cell, not with the number of saved searches.
+
+Matching runs in the request that creates the post, inside its transaction,
+so each match becomes exactly one notification. Other workers learn about new
+and deleted searches through saved_search.* events on the bus.
+"""
+import re
+from dataclasses import dataclass
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.events import bus
+from app.models.saved_search import SavedSearch
+from app.services.geo import cell_ranges, grid_cell, haversine_km
+
+# price_cents is a 32-bit INTEGER, so bit_length() is at most 31
+MAX_PRICE_BUCKET = 31
+# ~40 km around a mid-latitude campus; the schema allows up to 100 km
+MAX_SEARCH_CELLS = 400
+
+# the join drops searches deleted since this worker's index last heard about them
+INSERT_NOTIFICATIONS_SQL = text("""
+    INSERT INTO notifications (user_id, saved_search_id, post_id)
+    SELECT s.user_id, s.id, m.post_id
+    FROM unnest(CAST(:search_ids AS bigint[]), CAST(:post_ids AS bigint[])) AS m(search_id, post_id)
+    JOIN saved_searches s ON s.id = m.search_id
+    ON CONFLICT (saved_search_id, post_id) DO NOTHING
+""")
+
+
+def price_bucket(price_cents: int) -> int:
+    # 0 | 1 | 2-3 | 4-7 | ... | 1024-2047 cents | ...
+    return min(max(price_cents, 0).bit_length(), MAX_PRICE_BUCKET)
+
+
+def _stem(word: str) -> str:
+    # so "desk" finds "desks" and the other way round
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def words(text: str | None) -> frozenset[str]:
+    return frozenset(_stem(w) for w in re.findall(r"\w+", (text or "").lower()))
+
+
+@dataclass(frozen=True)
+class Criteria:
+    id: int
+    user_id: int
+    words: frozenset[str]
+    min_price_cents: int | None
+    max_price_cents: int | None
+    lat: float | None
+    lng: float | None
+    radius_km: float | None
+
+    @classmethod
+    def of(cls, fields: dict) -> "Criteria":
+        return cls(words=words(fields.pop("keywords")), **fields)
+
+    def keys(self):
+        if not self.words and self.radius_km is not None:
+            ranges = cell_ranges(self.lat, self.lng, self.radius_km)
+            if sum(hi - lo + 1 for lo, hi in ranges) <= MAX_SEARCH_CELLS:
+                return [(cell, None) for lo, hi in ranges for cell in range(lo, hi + 1)]
+        anchor = max(sorted(self.words), key=len) if self.words else None
+        lo = price_bucket(self.min_price_cents or 0)
+        hi = price_bucket(self.max_price_cents) if self.max_price_cents is not None else MAX_PRICE_BUCKET
+        return [(anchor, b) for b in range(lo, hi + 1)]
+
+    def matches(self, post_words: frozenset[str], post) -> bool:
+        if self.min_price_cents is not None and post.price_cents < self.min_price_cents:
+            return False
+        if self.max_price_cents is not None and post.price_cents > self.max_price_cents:
+            return False
+        if not self.words <= post_words:
+            return False
+        if self.radius_km is not None:
+            if post.lat is None or post.lng is None:
+                return False
+            return haversine_km(self.lat, self.lng, post.lat, post.lng) <= self.radius_km
+        return True
+
+
+class SearchIndex:
+    def __init__(self):
+        self._searches: dict[int, Criteria] = {}
+        self._index: dict[tuple[str | int | None, int | None], set[int]] = {}
+
+    def add(self, c: Criteria):
+        self.remove(c.id)
+        self._searches[c.id] = c
+        for key in c.keys():
+            self._index.setdefault(key, set()).add(c.id)
+
+    def remove(self, search_id: int):
+        c = self._searches.pop(search_id, None)
+        if c is None:
+            return
+        for key in c.keys():
+            ids = self._index[key]
+            ids.discard(search_id)
+            if not ids:
+                del self._index[key]
+
+    def clear(self):
+        self._searches.clear()
+        self._index.clear()
+
+    def match(self, post) -> list[Criteria]:
+        """Saved searches matching `post` (anything with title, description,
+        price_cents, lat and lng), other than the seller's own."""
+        post_words = words(f"{post.title} {post.description or ''}")
+        bucket = price_bucket(post.price_cents)
+        candidates: set[int] = set()
+        for w in (*post_words, None):
+            candidates.update(self._index.get((w, bucket), ()))
+        if post.lat is not None and post.lng is not None:
+            candidates.update(self._index.get((grid_cell(post.lat, post.lng), None), ()))
+        found = []
+        for search_id in candidates:
+            c = self._searches[search_id]
+            if c.user_id != post.seller_id and c.matches(post_words, post):
+                found.append(c)
+        return found
+
+    def stats(self) -> dict:
+        return {"searches": len(self._searches), "keys": len(self._index)}
+
+
+index = SearchIndex()
+
+
+async def load(db: AsyncSession):
+    searches = (await db.execute(select(SavedSearch))).scalars().all()
+    index.clear()
+    for s in searches:
+        index.add(Criteria.of(_fields(s)))
+
+
+async def notify_matches(db: AsyncSession, posts) -> int:
+    """Add a notification for every saved search one of `posts` matches, in the
+    caller's transaction. Returns how many matches were found."""
+    search_ids, post_ids = [], []
+    for post in posts:
+        for c in index.match(post):
+            search_ids.append(c.id)
+            post_ids.append(post.id)
+    if search_ids:
+        await db.execute(INSERT_NOTIFICATIONS_SQL, {"search_ids": search_ids, "post_ids": post_ids})
+    return len(search_ids)
+
+
+def _fields(s: SavedSearch) -> dict:
+    return {
+        "id": s.id, "user_id": s.user_id, "keywords": s.keywords,
+        "min_price_cents": s.min_price_cents, "max_price_cents": s.max_price_cents,
+        "lat": s.lat, "lng": s.lng, "radius_km": s.radius_km,
+    }
+
+
+def created_event(s: SavedSearch) -> dict:
+    return {"type": "saved_search.created", "search": _fields(s)}
+
+
+def deleted_event(search_id: int) -> dict:
+    return {"type": "saved_search.deleted", "search_id": search_id}
+
+
+def apply(e: dict):
+    """Update this worker's index from a saved_search.* event. Writers call it
+    right after commit too, so their own worker is current without waiting for the bus."""
+    if e["type"] == "saved_search.created":
+        index.add(Criteria.of(dict(e["search"])))
+    else:
+        index.remove(e["search_id"])
+
+
+async def _on_saved_search_events(events: list[dict]):
+    for e in events:
+        apply(e)
+
+
+async def _on_bus_reconnect(events: list[dict]):
+    from app.core.db import SessionLocal
+
+    # we may have missed creates and deletes while disconnected
+    async with SessionLocal() as db:
+        await load(db)
+
+
+bus.subscribe("saved_search.", _on_saved_search_events)
+bus.subscribe("bus.reconnected", _on_bus_reconnect)
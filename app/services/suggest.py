@@ -0,0 +1,152 @@
+"""Typeahead for GET /posts/suggest: words from active post titles, most used first.
+
+Every worker keeps the words in a sorted list with a count of active posts
+using each. A lookup bisects to the range sharing the prefix and takes the
+top few by count, so it never touches the database. One- and two-letter
+prefixes cover long ranges, so their top results are memoized until one of
+their words changes.
+
+Loaded at startup. Writers (bulk imports included, one per row) queue
+title_changed() in the transaction that makes a title appear or disappear
+from the active posts; every worker, including the writer's, applies it when
+the suggest.changed event arrives. After a bus reconnect the index is
+reloaded in the background, which also clears any drift.
+"""
+import asyncio
+import heapq
+import logging
+import re
+from bisect import bisect_left, insort
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.events import bus, queue_event
+from app.models.post import Post
+
+log = logging.getLogger(__name__)
+
+MAX_SUGGESTIONS = 20
+MEMO_PREFIX_LEN = 2
+
+
+def terms(title: str | None) -> set[str]:
+    return {w for w in re.findall(r"\w+", (title or "").lower()) if len(w) > 1}
+
+
+class PrefixIndex:
+    def __init__(self, max_terms: int):
+        self.max_terms = max_terms
+        self._terms: list[str] = []  # sorted
+        self._counts: dict[str, int] = {}
+        self._memo: dict[str, list[str]] = {}
+        self.dropped = 0
+
+    def load(self, counts: dict[str, int]):
+        keep = heapq.nlargest(self.max_terms, counts.items(), key=lambda kv: kv[1])
+        self._counts = dict(keep)
+        self._terms = sorted(self._counts)
+        self._memo.clear()
+        self.dropped = 0
+
+    def add(self, term: str, delta: int):
+        count = self._counts.get(term)
+        if count is None:
+            if delta <= 0:
+                return  # left out by the cap
+            if len(self._terms) >= self.max_terms:
+                self.dropped += 1
+                return
+            insort(self._terms, term)
+            count = 0
+        count += delta
+        if count > 0:
+            self._counts[term] = count
+        else:
+            del self._counts[term]
+            del self._terms[bisect_left(self._terms, term)]
+        for n in range(1, MEMO_PREFIX_LEN + 1):
+            self._memo.pop(term[:n], None)
+
+    def suggest(self, prefix: str, limit: int) -> list[tuple[str, int]]:
+        """Up to `limit` words starting with `prefix` (lowercase), by post count."""
+        if not prefix:
+            return []
+        top = self._memo.get(prefix)
+        if top is None:
+            lo = bisect_left(self._terms, prefix)
+            hi = bisect_left(self._terms, prefix + "\U0010ffff", lo)
+            top = heapq.nsmallest(MAX_SUGGESTIONS, self._terms[lo:hi], key=lambda t: (-self._counts[t], t))
+            if len(prefix) <= MEMO_PREFIX_LEN:
+                self._memo[prefix] = top
+        return [(t, self._counts[t]) for t in top[:limit]]
+
+    def stats(self) -> dict:
+        return {"terms": len(self._terms), "max_terms": self.max_terms,
+                "dropped": self.dropped, "memoized_prefixes": len(self._memo)}
+
+
+titles = PrefixIndex(settings.SUGGEST_MAX_TERMS)
+
+
+async def load(db: AsyncSession):
+    counts: dict[str, int] = {}
+    result = await db.stream_scalars(
+        select(Post.title).where(Post.status == "active").execution_options(yield_per=5000)
+    )
+    async for title in result:
+        for t in terms(title):
+            counts[t] = counts.get(t, 0) + 1
+    titles.load(counts)
+
+
+def title_changed(db: AsyncSession, post_id: int, version: int, old: str | None, new: str | None):
+    """Queue an index update: the post's active title went from `old` to `new`
+    (None = not active). `version` is the post's version before the write; it
+    keeps two otherwise identical updates from being merged by the bus."""
+    if old != new:
+        queue_event(db, {"type": "suggest.changed", "post_id": post_id, "version": version,
+                         "old": old, "new": new})
+
+
+def _apply(e: dict):
+    old, new = terms(e["old"]), terms(e["new"])
+    for t in old - new:
+        titles.add(t, -1)
+    for t in new - old:
+        titles.add(t, 1)
+
+
+_reload_task: asyncio.Task | None = None
+
+
+async def _reload():
+    from app.core.db import SessionLocal
+
+    try:
+        async with SessionLocal() as db:
+            await load(db)
+    except Exception:
+        log.exception("suggest: reload failed, keeping the current index")
+
+
+def _schedule_reload():
+    # streaming every active title takes a while: keep it off the bus dispatch
+    # path, and don't start a second one while one is running
+    global _reload_task
+    if _reload_task is None or _reload_task.done():
+        _reload_task = asyncio.create_task(_reload())
+
+
+async def _on_suggest_events(events: list[dict]):
+    for e in events:
+        _apply(e)
+
+
+async def _on_bus_reconnect(events: list[dict]):
+    _schedule_reload()
+
+
+bus.subscribe("suggest.", _on_suggest_events)
+bus.subscribe("bus.reconnected", _on_bus_reconnect)
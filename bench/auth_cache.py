@@ -0,0 +1,95 @@
+"""Throughput of an authenticated endpoint with the CurrentUser cache off, on,
+and with AUTH_TOKEN_CLAIMS (no lookup at all).
+
+    BENCH_DATABASE_URL=... python -m bench.auth_cache --requests 2000 --concurrency 16
+
+Every mode sends the same requests to GET /chat/unread, a cheap
+authenticated route where the user lookup is a large share of the work, from
+--users distinct users (a warmup pass fills the cache first). Prints req/s,
+p50/p99 and SQL statements per request for each mode.
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+from bench.__main__ import _percentile
+
+ROUTE = ("GET", "/chat/unread")
+
+
+async def main(args) -> int:
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ.setdefault("DB_ECHO", "false")
+    os.environ.setdefault("SLOW_REQUEST_MS", "1e9")
+
+    import httpx
+
+    from app.core.auth import COOKIE_NAME, user_cache
+    from app.core.config import settings
+    from app.core.metrics import registry
+    from app.core.security import create_access_token
+    from app.main import app
+    from bench.seed import seed
+
+    ctx = await seed(args.scale, args.seed)
+    rng = random.Random(args.seed)
+    users = rng.sample(range(1, ctx.users + 1), min(args.users, ctx.users))
+    plain = {u: create_access_token(u) for u in users}
+    # what issue_token() puts in the cookie with AUTH_TOKEN_CLAIMS on (the seed's email/name)
+    claims = {u: create_access_token(u, {"email": f"bench{u}@example.edu", "name": f"Bench User {u}"}) for u in users}
+
+    async def run(client, tokens: dict[int, str], n: int) -> list[float]:
+        order = [rng.choice(users) for _ in range(n)]
+        latencies = []
+
+        async def worker():
+            while order:
+                token = tokens[order.pop()]
+                start = time.perf_counter()
+                r = await client.get("/chat/unread", headers={"cookie": f"{COOKIE_NAME}={token}"})
+                r.raise_for_status()
+                latencies.append(time.perf_counter() - start)
+
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        return sorted(latencies)
+
+    modes = [
+        ("no cache", 0, False, plain),
+        ("user cache", settings.AUTH_USER_CACHE_SIZE or 10000, False, plain),
+        ("token claims", 0, True, claims),
+    ]
+    print(f"{'mode':<14}{'req/s':>9}{'p50 ms':>9}{'p99 ms':>9}{'sql/req':>9}")
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for label, cache_size, token_claims, tokens in modes:
+            user_cache.clear()
+            user_cache.maxsize = cache_size
+            settings.AUTH_TOKEN_CLAIMS = token_claims
+            await run(client, tokens, len(users))  # warmup: one request per user
+
+            before = registry.statements.get(ROUTE)
+            sql0, n0 = (before.sum, before.count) if before else (0, 0)
+            start = time.perf_counter()
+            latencies = await run(client, tokens, args.requests)
+            wall = time.perf_counter() - start
+            after = registry.statements[ROUTE]
+            print(f"{label:<14}{len(latencies) / wall:>9.1f}{_percentile(latencies, 0.5) * 1000:>9.2f}"
+                  f"{_percentile(latencies, 0.99) * 1000:>9.2f}{(after.sum - sql0) / (after.count - n0):>9.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(prog="python -m bench.auth_cache")
+    p.add_argument("--database-url", default=os.getenv("BENCH_DATABASE_URL"))
+    p.add_argument("--scale", type=float, default=0.2)
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--users", type=int, default=200, help="distinct users sending requests")
+    p.add_argument("--requests", type=int, default=2000, help="per mode")
+    p.add_argument("--concurrency", type=int, default=16)
+    args = p.parse_args()
+    if not args.database_url:
+        sys.exit("set BENCH_DATABASE_URL or pass --database-url (the database is wiped on every run)")
+    sys.exit(asyncio.run(main(args)))
@@ -0,0 +1,107 @@
+"""GET /chat/conversations as one user's inbox grows from tens to tens of
+thousands of threads: latency and SQL statements per request should stay flat.
+
+    BENCH_DATABASE_URL=... python -m bench.chat_inbox --threads 10,100,1000,10000,50000
+
+The user gets half the threads as buyer and half as seller (the page merges
+both roles), with random updated_at. Each size is timed on the first page and
+on a page a few cursors deep. Exits 1 if the statement count changes with size.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+from bench.__main__ import _percentile
+
+ROUTE = ("GET", "/chat/conversations")
+
+# `n` extra posts by :seller, each with a thread where :buyer is the buyer
+GROW_SQL = """
+    WITH new_posts AS (
+        INSERT INTO posts (seller_id, title, price_cents, status)
+        SELECT CAST(:seller AS bigint), 'inbox bench ' || g, 100, 'active'
+        FROM generate_series(1, :n) g
+        RETURNING id
+    )
+    INSERT INTO conversations (post_id, buyer_id, seller_id, updated_at)
+    SELECT id, CAST(:buyer AS bigint), CAST(:seller AS bigint), now() - random() * interval '90 days'
+    FROM new_posts
+"""
+
+
+async def main(args) -> int:
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ.setdefault("DB_ECHO", "false")
+    os.environ.setdefault("SLOW_REQUEST_MS", "1e9")
+
+    import httpx
+    from sqlalchemy import text
+
+    from app.core.auth import COOKIE_NAME
+    from app.core.db import SessionLocal
+    from app.core.metrics import registry
+    from app.core.security import create_access_token
+    from app.main import app
+    from bench.seed import seed
+
+    ctx = await seed(args.scale, args.seed)
+    user, other = ctx.users, ctx.users - 1  # the last seeded users have few threads of their own
+    headers = {"cookie": f"{COOKIE_NAME}={create_access_token(user)}"}
+
+    async def timed(client, cursor=None):
+        start = time.perf_counter()
+        r = await client.get("/chat/conversations", params={"limit": args.limit, **({"cursor": cursor} if cursor else {})},
+                             headers=headers)
+        r.raise_for_status()
+        return time.perf_counter() - start, r.json()["next_cursor"]
+
+    print(f"{'threads':>8}{'page':>7}{'p50 ms':>9}{'p95 ms':>9}{'sql/req':>9}")
+    statements = set()
+    have = 0
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for size in args.threads:
+            add = size - have
+            async with SessionLocal() as db:
+                await db.execute(text(GROW_SQL), {"buyer": user, "seller": other, "n": add // 2})
+                await db.execute(text(GROW_SQL), {"buyer": other, "seller": user, "n": add - add // 2})
+                await db.execute(text("ANALYZE conversations"))
+                await db.commit()
+            have = size
+
+            # a cursor a few pages in
+            deep = None
+            for _ in range(args.depth):
+                _, deep = await timed(client, deep)
+
+            for label, cursor in (("first", None), (f"+{args.depth}", deep)):
+                before = registry.statements.get(ROUTE)
+                sql0, n0 = (before.sum, before.count) if before else (0, 0)
+                times = sorted([(await timed(client, cursor))[0] for _ in range(args.requests)])
+                after = registry.statements[ROUTE]
+                per_req = (after.sum - sql0) / (after.count - n0)
+                statements.add(round(per_req, 2))
+                print(f"{size:>8}{label:>7}{_percentile(times, 0.5) * 1000:>9.2f}"
+                      f"{_percentile(times, 0.95) * 1000:>9.2f}{per_req:>9.2f}")
+
+    if len(statements) > 1:
+        print(f"FAILED: statements per request varied with inbox size: {sorted(statements)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(prog="python -m bench.chat_inbox")
+    p.add_argument("--database-url", default=os.getenv("BENCH_DATABASE_URL"))
+    p.add_argument("--scale", type=float, default=0.1)
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--threads", type=lambda s: [int(x) for x in s.split(",")], default=[10, 100, 1000, 10000, 50000])
+    p.add_argument("--limit", type=int, default=30)
+    p.add_argument("--depth", type=int, default=5, help="also time the page this many cursors in")
+    p.add_argument("--requests", type=int, default=50)
+    args = p.parse_args()
+    if not args.database_url:
+        sys.exit("set BENCH_DATABASE_URL or pass --database-url (the database is wiped on every run)")
+    sys.exit(asyncio.run(main(args)))
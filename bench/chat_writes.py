@@ -0,0 +1,74 @@
+"""Messages/second of the chat write path: one transaction per message (what
+send_message does by default) vs the group-commit writer.
+
+    BENCH_DATABASE_URL=... python -m bench.chat_writes --messages 3000 --concurrency 64
+
+Both sides do the same work per message (INSERT, last_message_* bump, unread
+counter, commit) without HTTP or auth in the way, against the bench seed.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+
+async def main(args):
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ.setdefault("DB_ECHO", "false")
+
+    from app.core.db import SessionLocal
+    from app.models.message import Message
+    from app.services.chat_counters import NewMessage, record_messages
+    from app.services.chat_writer import GroupCommitWriter, PendingMessage
+    from bench.seed import seed
+
+    ctx = await seed(args.scale, args.seed)
+    hot = ctx.conversations[: args.conversations]
+
+    async def one_per_commit(i: int):
+        conv_id, buyer_id, seller_id = hot[i % len(hot)]
+        async with SessionLocal() as db:
+            msg = Message(conversation_id=conv_id, sender_id=buyer_id, body=f"bench {i}")
+            db.add(msg)
+            await db.flush()
+            await record_messages(db, [NewMessage(conv_id, msg.id, msg.created_at, seller_id)])
+            await db.commit()
+
+    writer = GroupCommitWriter(args.window_ms, args.max_batch)
+    await writer.start()
+
+    async def group_commit(i: int):
+        conv_id, buyer_id, seller_id = hot[i % len(hot)]
+        await writer.submit(PendingMessage(conv_id, buyer_id, seller_id, f"bench {i}"))
+
+    slots = asyncio.Semaphore(args.concurrency)
+
+    async def run(fn, i):
+        async with slots:
+            await fn(i)
+
+    print(f"{args.messages} messages, concurrency {args.concurrency}, {len(hot)} conversations")
+    for name, fn in (("one commit per message", one_per_commit), ("group commit", group_commit)):
+        start = time.perf_counter()
+        await asyncio.gather(*(run(fn, i) for i in range(args.messages)))
+        print(f"{name:<24}{args.messages / (time.perf_counter() - start):>10.0f} msg/s")
+
+    print(f"group commit batches: {writer.stats()}")
+    await writer.stop()
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(prog="python -m bench.chat_writes")
+    p.add_argument("--database-url", default=os.getenv("BENCH_DATABASE_URL"))
+    p.add_argument("--scale", type=float, default=0.1)
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--messages", type=int, default=3000)
+    p.add_argument("--concurrency", type=int, default=64)
+    p.add_argument("--conversations", type=int, default=20, help="spread writes over this many threads")
+    p.add_argument("--window-ms", type=float, default=2.0)
+    p.add_argument("--max-batch", type=int, default=256)
+    args = p.parse_args()
+    if not args.database_url:
+        sys.exit("set BENCH_DATABASE_URL or pass --database-url (the database is wiped on every run)")
+    asyncio.run(main(args))
@@ -0,0 +1,168 @@
+"""Thousands of /chat/ws sockets on one event loop, driven in-process through the
+ASGI app (no network): handshake checks, fan-out latency, lag kicks, teardown.
+
+    BENCH_DATABASE_URL=... python -m bench.chat_ws --sockets 5000 --events 20
+
+Every socket goes through the real handshake (Origin check, cookie auth,
+accept). A cross-site Origin and a missing cookie must be refused before
+accept. Then events are published to every connected user and timed until the
+last socket has them; a few sockets never drain their outbox and must be
+closed with 1013 while the rest keep up. Exits 1 if any check fails.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+from bench.__main__ import _percentile
+
+
+class FakeSocket:
+    """The client end of one ASGI websocket connection."""
+
+    def __init__(self, app, headers: list[tuple[bytes, bytes]], slow: bool = False):
+        self.inbox: asyncio.Queue = asyncio.Queue()
+        self.accepted = asyncio.Event()
+        self.closed = asyncio.Event()
+        self.close_code = None
+        self.received = 0
+        self.got_all = asyncio.Event()
+        self.expect = 0
+        self.slow = slow
+        scope = {"type": "websocket", "path": "/chat/ws", "raw_path": b"/chat/ws", "root_path": "",
+                 "scheme": "ws", "query_string": b"", "headers": headers, "subprotocols": [],
+                 "server": ("bench", 80), "client": ("127.0.0.1", 1), "asgi": {"version": "3.0"}}
+        self.inbox.put_nowait({"type": "websocket.connect"})
+        self.task = asyncio.create_task(app(scope, self.inbox.get, self._send))
+
+    async def _send(self, message: dict):
+        kind = message["type"]
+        if kind == "websocket.accept":
+            self.accepted.set()
+        elif kind == "websocket.close":
+            self.close_code = message.get("code", 1000)
+            self.closed.set()
+        elif kind == "websocket.send":
+            if self.slow:
+                await asyncio.Event().wait()  # a client that stopped reading
+            if '"ping"' not in message.get("text", ""):
+                self.received += 1
+                if self.received >= self.expect:
+                    self.got_all.set()
+
+    async def handshake(self):
+        waits = [asyncio.create_task(self.accepted.wait()), asyncio.create_task(self.closed.wait())]
+        await asyncio.wait(waits, return_when=asyncio.FIRST_COMPLETED)
+        for t in waits:
+            t.cancel()
+        return self.accepted.is_set()
+
+    def disconnect(self):
+        self.inbox.put_nowait({"type": "websocket.disconnect", "code": 1000})
+
+
+async def main(args) -> int:
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ.setdefault("DB_ECHO", "false")
+    os.environ.setdefault("SLOW_REQUEST_MS", "1e9")
+
+    from app.core.auth import COOKIE_NAME
+    from app.core.config import settings
+    from app.core.security import create_access_token
+    from app.main import app
+    from app.services.chat_hub import CLOSE_LAGGING, hub
+    from bench.seed import seed
+
+    ctx = await seed(args.scale, args.seed)
+    origin = settings.cors_origins[0].encode()
+
+    def headers(user_id: int | None, origin: bytes | None = origin):
+        h = []
+        if user_id is not None:
+            h.append((b"cookie", f"{COOKIE_NAME}={create_access_token(user_id)}".encode()))
+        if origin is not None:
+            h.append((b"origin", origin))
+        return h
+
+    failures = []
+
+    # handshakes that must be refused before accept(), and ones that must not
+    for label, h, want in (
+        ("cross-site origin", headers(1, b"https://evil.example"), False),
+        ("no cookie", headers(None), False),
+        ("allowed origin", headers(1), True),
+        ("no origin (not a browser)", headers(1, None), True),
+    ):
+        sock = FakeSocket(app, h)
+        ok = await sock.handshake()
+        if ok != want:
+            failures.append(f"{label}: {'accepted' if ok else 'refused'}")
+        sock.disconnect()
+        await sock.task
+    print(f"handshake checks: {4 - len(failures)}/4 ok")
+
+    # open every socket; users get several each, like tabs
+    n_slow = min(args.slow, args.sockets)
+    start = time.perf_counter()
+    socks = [FakeSocket(app, headers(i % ctx.users + 1), slow=i < n_slow) for i in range(args.sockets)]
+    accepted = await asyncio.gather(*(s.handshake() for s in socks))
+    opened = time.perf_counter() - start
+    if not all(accepted):
+        failures.append(f"{accepted.count(False)} of {args.sockets} sockets refused")
+    print(f"opened {args.sockets} sockets in {opened:.2f}s, hub has {hub.connection_count}")
+
+    fast = socks[n_slow:]
+    user_ids = list(range(1, ctx.users + 1))
+    latencies = []
+    for n in range(1, args.events + 1):
+        for s in fast:
+            s.expect, s.got_all = n, asyncio.Event()
+        start = time.perf_counter()
+        hub.publish(user_ids, {"type": "bench", "n": n})
+        await asyncio.wait_for(asyncio.gather(*(s.got_all.wait() for s in fast)), args.timeout)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    print(f"fan-out to {len(fast)} sockets: p50 {_percentile(latencies, 0.5) * 1000:.1f} ms, "
+          f"p99 {_percentile(latencies, 0.99) * 1000:.1f} ms, "
+          f"{len(fast) / _percentile(latencies, 0.5):,.0f} deliveries/s")
+
+    # the stuck sockets' outboxes are full by now, or will be after a few more events
+    for n in range(hub.queue_size + 1):
+        hub.publish(user_ids, {"type": "bench", "n": "fill"})
+        await asyncio.sleep(0)
+    slow = socks[:n_slow]
+    await asyncio.wait_for(asyncio.gather(*(s.closed.wait() for s in slow)), args.timeout)
+    lagging = sum(s.close_code == CLOSE_LAGGING for s in slow)
+    if lagging != n_slow:
+        failures.append(f"only {lagging} of {n_slow} stuck sockets were closed with {CLOSE_LAGGING}")
+    if any(s.closed.is_set() for s in fast):
+        failures.append("sockets that kept up were closed")
+    print(f"stuck sockets closed with {CLOSE_LAGGING}: {lagging}/{n_slow}")
+
+    start = time.perf_counter()
+    for s in fast:
+        s.disconnect()
+    await asyncio.wait_for(asyncio.gather(*(s.task for s in socks)), args.timeout)
+    print(f"closed {len(fast)} sockets in {time.perf_counter() - start:.2f}s, hub has {hub.connection_count}")
+    if hub.connection_count:
+        failures.append(f"{hub.connection_count} connections left registered")
+
+    for f in failures:
+        print(f"FAILED: {f}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(prog="python -m bench.chat_ws")
+    p.add_argument("--database-url", default=os.getenv("BENCH_DATABASE_URL"))
+    p.add_argument("--scale", type=float, default=0.1)
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--sockets", type=int, default=5000)
+    p.add_argument("--events", type=int, default=20, help="events published to every socket")
+    p.add_argument("--slow", type=int, default=10, help="sockets that never read")
+    p.add_argument("--timeout", type=float, default=60.0)
+    args = p.parse_args()
+    if not args.database_url:
+        sys.exit("set BENCH_DATABASE_URL or pass --database-url (the database is wiped on every run)")
+    sys.exit(asyncio.run(main(args)))
@@ -0,0 +1,116 @@
+"""Latency of cheap routes while a login storm keeps bcrypt saturated.
+
+    BENCH_DATABASE_URL=... python -m bench.login_storm --logins 64 --seconds 10
+
+Probes GET /health and GET /posts one request at a time, first on an idle
+app, then while --logins clients send POST /auth/login back to back. bcrypt
+runs on PASSWORD_HASH_CONCURRENCY threads, so the event loop should keep
+serving the probes. Logins that can't get a hashing slot within
+PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS (lowered here so the storm reaches it)
+must come back as 503 with Retry-After. Exits 1 if no login was shed, a 503
+lacks Retry-After, or a probe's p99 goes over --max-p99-ms.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+from bench.__main__ import _percentile
+
+PROBES = ["/health", "/posts"]
+
+
+async def main(args) -> int:
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ.setdefault("DB_ECHO", "false")
+    os.environ.setdefault("SLOW_REQUEST_MS", "1e9")
+    os.environ.setdefault("PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS", str(args.queue_timeout))
+
+    import httpx
+
+    from app.core.config import settings
+    from app.main import app
+    from bench.seed import BENCH_PASSWORD, seed
+
+    ctx = await seed(args.scale, args.seed)
+    stop = asyncio.Event()
+
+    async def probe(client, path: str, out: list[float]):
+        while not stop.is_set():
+            start = time.perf_counter()
+            r = await client.get(path)
+            r.raise_for_status()
+            out.append(time.perf_counter() - start)
+            await asyncio.sleep(args.probe_interval)
+
+    logins = {"ok": 0, "shed": 0, "no_retry_after": 0, "other": 0}
+
+    async def storm(client, i: int):
+        user = i % ctx.users + 1
+        while not stop.is_set():
+            r = await client.post("/auth/login", json={"email": f"bench{user}@example.edu", "password": BENCH_PASSWORD})
+            if r.status_code == 200:
+                logins["ok"] += 1
+            elif r.status_code == 503:
+                logins["shed"] += 1
+                if "retry-after" not in r.headers:
+                    logins["no_retry_after"] += 1
+            else:
+                logins["other"] += 1
+
+    async def phase(client, n_logins: int) -> dict[str, list[float]]:
+        stop.clear()
+        times = {path: [] for path in PROBES}
+        tasks = [asyncio.create_task(probe(client, path, times[path])) for path in PROBES]
+        tasks += [asyncio.create_task(storm(client, i)) for i in range(n_logins)]
+        await asyncio.sleep(args.seconds)
+        stop.set()
+        await asyncio.gather(*tasks)
+        return {path: sorted(t) for path, t in times.items()}
+
+    failures = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+        idle = await phase(client, 0)
+        stormy = await phase(client, args.logins)
+
+    print(f"bcrypt: {settings.PASSWORD_HASH_CONCURRENCY} threads, queue timeout "
+          f"{settings.PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS}s; {args.logins} login clients for {args.seconds}s")
+    print(f"logins: {logins['ok']} ok ({logins['ok'] / args.seconds:.1f}/s), {logins['shed']} shed with 503, "
+          f"{logins['other']} other errors")
+    print(f"\n{'route':<10}{'idle p50':>10}{'idle p99':>10}{'storm p50':>11}{'storm p99':>11}  (ms)")
+    for path in PROBES:
+        a, b = idle[path], stormy[path]
+        storm_p99 = _percentile(b, 0.99) * 1000
+        print(f"{path:<10}{_percentile(a, 0.5) * 1000:>10.2f}{_percentile(a, 0.99) * 1000:>10.2f}"
+              f"{_percentile(b, 0.5) * 1000:>11.2f}{storm_p99:>11.2f}")
+        if args.max_p99_ms and storm_p99 > args.max_p99_ms:
+            failures.append(f"{path} p99 {storm_p99:.1f}ms during the storm (limit {args.max_p99_ms}ms)")
+
+    if not logins["shed"]:
+        failures.append("no login was shed with 503: raise --logins or lower --queue-timeout")
+    if logins["no_retry_after"]:
+        failures.append(f"{logins['no_retry_after']} 503s without Retry-After")
+    if logins["other"]:
+        failures.append(f"{logins['other']} logins failed with something other than 503")
+    for f in failures:
+        print(f"FAILED: {f}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(prog="python -m bench.login_storm")
+    p.add_argument("--database-url", default=os.getenv("BENCH_DATABASE_URL"))
+    p.add_argument("--scale", type=float, default=0.1)
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--logins", type=int, default=64, help="concurrent login clients during the storm")
+    p.add_argument("--seconds", type=float, default=10.0, help="per phase")
+    p.add_argument("--queue-timeout", type=float, default=0.5,
+                   help="PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS, unless already set")
+    p.add_argument("--probe-interval", type=float, default=0.01)
+    p.add_argument("--max-p99-ms", type=float, help="fail if a probe's p99 during the storm is above this")
+    args = p.parse_args()
+    if not args.database_url:
+        sys.exit("set BENCH_DATABASE_URL or pass --database-url (the database is wiped on every run)")
+    sys.exit(asyncio.run(main(args)))
@@ -0,0 +1,97 @@
+"""Hundreds of buyers racing for the same post through POST /transactions/purchase.
+
+    BENCH_DATABASE_URL=... python -m bench.purchase_contention --buyers 300 --rounds 5
+
+Every round picks a fresh active post and fires one purchase per buyer at
+once. Exits 1 unless each round has exactly one winner, every loser got a
+409, and the database holds exactly one transaction per post.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+from bench.__main__ import _percentile
+
+
+async def main(args) -> int:
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ.setdefault("DB_ECHO", "false")
+    os.environ.setdefault("SLOW_REQUEST_MS", "1e9")
+    os.environ.setdefault("EVENT_BUS_BACKEND", "memory")
+
+    import httpx
+    from sqlalchemy import func, select
+
+    from app.core.auth import COOKIE_NAME
+    from app.core.db import SessionLocal
+    from app.core.security import create_access_token
+    from app.main import app
+    from app.models.post import Post
+    from app.models.transaction import Transaction
+    from bench.seed import seed
+
+    ctx = await seed(args.scale, args.seed)
+    if ctx.users < args.buyers + 1:
+        sys.exit(f"--scale {args.scale:g} seeds only {ctx.users} users; raise it or lower --buyers")
+
+    # seeded transactions point at random posts; race for active ones nobody bought yet
+    async with SessionLocal() as db:
+        targets = (await db.execute(
+            select(Post.id, Post.seller_id)
+            .where(Post.status == "active", Post.id.not_in(select(Transaction.post_id)))
+            .order_by(Post.id)
+            .limit(args.rounds)
+        )).all()
+
+    failed = False
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for post_id, seller_id in targets:
+            buyers = [u for u in range(1, ctx.users + 1) if u != seller_id][: args.buyers]
+            cookies = [{"cookie": f"{COOKIE_NAME}={create_access_token(u)}"} for u in buyers]
+
+            async def buy(headers):
+                start = time.perf_counter()
+                r = await client.post(f"/transactions/purchase?post_id={post_id}", headers=headers)
+                return r.status_code, time.perf_counter() - start
+
+            start = time.perf_counter()
+            results = await asyncio.gather(*(buy(h) for h in cookies))
+            wall = time.perf_counter() - start
+
+            statuses: dict[int, int] = {}
+            for status, _ in results:
+                statuses[status] = statuses.get(status, 0) + 1
+            lost = sorted(t for status, t in results if status == 409)
+            won = [t for status, t in results if status == 200]
+
+            async with SessionLocal() as db:
+                created = (await db.execute(
+                    select(func.count()).select_from(Transaction).where(Transaction.post_id == post_id)
+                )).scalar_one()
+
+            ok = statuses.get(200) == 1 and statuses.get(409) == len(buyers) - 1 and created == 1
+            failed |= not ok
+            print(
+                f"post {post_id}: {len(buyers)} buyers in {wall * 1000:.0f}ms  "
+                f"statuses {dict(sorted(statuses.items()))}  transactions {created}  "
+                f"winner {won[0] * 1000 if won else float('nan'):.1f}ms  "
+                f"losers p50 {_percentile(lost, 0.5) * 1000:.1f}ms p95 {_percentile(lost, 0.95) * 1000:.1f}ms"
+                f"{'' if ok else '  FAILED'}"
+            )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(prog="python -m bench.purchase_contention")
+    p.add_argument("--database-url", default=os.getenv("BENCH_DATABASE_URL"))
+    p.add_argument("--scale", type=float, default=0.5)
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--buyers", type=int, default=300)
+    p.add_argument("--rounds", type=int, default=5)
+    args = p.parse_args()
+    if not args.database_url:
+        sys.exit("set BENCH_DATABASE_URL or pass --database-url (the database is wiped on every run)")
+    sys.exit(asyncio.run(main(args)))
@@ -0,0 +1,104 @@
+"""Cost of matching one new post against N saved searches: the reverse index in
+app.services.saved_searches vs checking every search.
+
+    python -m bench.saved_searches --searches 1000,10000,100000 --posts 2000
+
+In memory only, no database. Most searches get one or two keywords from a
+VOCABULARY-word vocabulary (the seed's item names plus made-up words), the
+rest either a low max price or only a radius around a point near campus; some
+keyword searches also get a radius around campus. Posts are made from the same
+words.
+"""
+import argparse
+import os
+import random
+import time
+from types import SimpleNamespace
+
+# app settings insist on one; nothing here connects to it
+os.environ.setdefault("DATABASE_URL", "postgresql+asyncpg://localhost/unused")
+
+from app.services.saved_searches import Criteria, SearchIndex, words  # noqa: E402
+from bench.seed import ADJECTIVES, CAMPUS, ITEMS  # noqa: E402
+
+VOCABULARY = 5000
+
+
+def _searches(rng: random.Random, n: int, vocab: list[str]) -> list[Criteria]:
+    out = []
+    for i in range(n):
+        keywords = " ".join(rng.sample(vocab, rng.choice((1, 1, 2)))) if rng.random() < 0.95 else None
+        lo = rng.choice((None, rng.randrange(0, 5000)))
+        hi = rng.choice((None, (lo or 0) + rng.randrange(500, 20000)))
+        near = rng.random() < 0.3
+        center = CAMPUS
+        if keywords is None:
+            # POST /saved-searches wants keywords, a max price or a radius
+            lo, hi = None, None
+            near = rng.random() < 0.5
+            if near:
+                center = (CAMPUS[0] + rng.uniform(-0.1, 0.1), CAMPUS[1] + rng.uniform(-0.1, 0.1))
+            else:
+                hi = rng.randrange(100, 2000)
+        out.append(Criteria.of({
+            "id": i + 1, "user_id": rng.randrange(1, 1000), "keywords": keywords,
+            "min_price_cents": lo, "max_price_cents": hi,
+            "lat": center[0] if near else None, "lng": center[1] if near else None,
+            "radius_km": rng.uniform(1, 10) if near else None,
+        }))
+    return out
+
+
+def _posts(rng: random.Random, n: int, vocab: list[str]) -> list[SimpleNamespace]:
+    return [
+        SimpleNamespace(
+            id=i + 1, seller_id=rng.randrange(1, 1000),
+            title=f"{rng.choice(ADJECTIVES)} {rng.choice(vocab)} {rng.choice(vocab)}",
+            description=" ".join(rng.choices(vocab, k=12)),
+            price_cents=rng.randrange(0, 30000),
+            lat=CAMPUS[0] + rng.uniform(-0.1, 0.1), lng=CAMPUS[1] + rng.uniform(-0.1, 0.1),
+        )
+        for i in range(n)
+    ]
+
+
+def _scan(searches: list[Criteria], post) -> list[Criteria]:
+    post_words = words(f"{post.title} {post.description or ''}")
+    return [c for c in searches if c.user_id != post.seller_id and c.matches(post_words, post)]
+
+
+def main(args):
+    rng = random.Random(args.seed)
+    vocab = [w for item in ITEMS for w in item.split()] + [f"w{i:04d}" for i in range(VOCABULARY - len(ITEMS))]
+    posts = _posts(rng, args.posts, vocab)
+
+    print(f"{'searches':>10}{'index us/post':>16}{'scan us/post':>16}{'speedup':>10}{'matches/post':>14}")
+    for n in args.searches:
+        searches = _searches(rng, n, vocab)
+        index = SearchIndex()
+        for c in searches:
+            index.add(c)
+
+        start = time.perf_counter()
+        found = [sorted(c.id for c in index.match(p)) for p in posts]
+        indexed = time.perf_counter() - start
+
+        scan_posts = posts[: max(1, args.posts * 1000 // n)]  # keep the scan's runtime bounded
+        start = time.perf_counter()
+        expected = [sorted(c.id for c in _scan(searches, p)) for p in scan_posts]
+        scanned = time.perf_counter() - start
+        if expected != found[: len(scan_posts)]:
+            raise SystemExit("index and scan disagree")
+
+        per_index = indexed / len(posts) * 1e6
+        per_scan = scanned / len(scan_posts) * 1e6
+        matches = sum(map(len, found)) / len(posts)
+        print(f"{n:>10}{per_index:>16.1f}{per_scan:>16.1f}{per_scan / per_index:>9.0f}x{matches:>14.2f}")
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(prog="python -m bench.saved_searches")
+    p.add_argument("--searches", type=lambda s: [int(x) for x in s.split(",")], default=[1000, 10000, 100000])
+    p.add_argument("--posts", type=int, default=2000)
+    p.add_argument("--seed", type=int, default=42)
+    main(p.parse_args())
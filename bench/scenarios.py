@@ -0,0 +1,127 @@
+"""One Scenario per endpoint worth tracking.
+
+`build(ctx, rng)` returns the request to send: (path, user_id or None, json
+body or None). `route` is the template the metrics middleware labels the
+request with, which is how per-endpoint query counts are looked up.
+`share` scales --requests for scenarios that are slow by design (bcrypt).
+`check`, if set, gets every successful response body and returns what is
+wrong with them, or None.
+"""
+import random
+from dataclasses import dataclass
+from typing import Callable
+
+from bench.seed import BENCH_PASSWORD, CAMPUS, ITEMS, Seeded, _title
+
+
+@dataclass
+class Scenario:
+    name: str
+    method: str
+    route: str
+    build: Callable[[Seeded, random.Random], tuple[str, int | None, dict | None]]
+    share: float = 1.0
+    check: Callable[[list], str | None] | None = None
+
+
+def _user(ctx: Seeded, rng: random.Random) -> int:
+    return rng.randint(1, ctx.users)
+
+
+def _conversation(ctx: Seeded, rng: random.Random) -> tuple[int, int]:
+    conv_id, buyer_id, seller_id = rng.choice(ctx.conversations)
+    return conv_id, rng.choice((buyer_id, seller_id))
+
+
+def _login(ctx, rng):
+    return "/auth/login", None, {"email": f"bench{_user(ctx, rng)}@example.edu", "password": BENCH_PASSWORD}
+
+
+def _messages(ctx, rng):
+    conv_id, user_id = _conversation(ctx, rng)
+    return f"/chat/conversations/{conv_id}/messages", user_id, None
+
+
+def _send(ctx, rng):
+    conv_id, user_id = _conversation(ctx, rng)
+    return f"/chat/conversations/{conv_id}/messages", user_id, {"body": "is this still available?"}
+
+
+def _read(ctx, rng):
+    conv_id, user_id = _conversation(ctx, rng)
+    return f"/chat/conversations/{conv_id}/read", user_id, None
+
+
+def _read_many(ctx, rng):
+    # one user acking a screenful of threads: the first is theirs, the rest are skipped if not
+    conv_id, user_id = _conversation(ctx, rng)
+    ids = [conv_id] + [rng.choice(ctx.conversations)[0] for _ in range(19)]
+    return "/chat/read", user_id, {"conversation_ids": ids}
+
+
+def _open_conversation(ctx, rng):
+    post_id, seller_id = rng.choice(ctx.posts)
+    buyer_id = seller_id % ctx.users + 1
+    return "/chat/conversations", buyer_id, {"post_id": post_id}
+
+
+def _open_hot_conversation(ctx, rng):
+    # every client opens the same thread at once: exercises the upsert's conflict path
+    post_id, seller_id = ctx.posts[0]
+    return "/chat/conversations", seller_id % ctx.users + 1, {"post_id": post_id}
+
+
+def _one_thread(bodies):
+    ids = {b["id"] for b in bodies}
+    return f"concurrent opens got {len(ids)} different conversation ids" if len(ids) > 1 else None
+
+
+def _transaction(ctx, rng):
+    # a bought post is sold, so every request needs one nobody has bought yet
+    if not ctx.for_sale:
+        raise SystemExit("transactions.create ran out of posts for sale: raise --scale or lower --requests")
+    post_id, seller_id = ctx.for_sale.pop()
+    return f"/transactions?post_id={post_id}&seller_id={seller_id}", seller_id % ctx.users + 1, None
+
+
+def _rating(ctx, rng):
+    # each side may rate a transaction once, so every request takes a fresh slot
+    if not ctx.unrated:
+        raise SystemExit("ratings.create ran out of unrated transactions: raise --scale or lower --requests")
+    tx_id, rater_id = ctx.unrated.pop()
+    return "/ratings", rater_id, {"transaction_id": tx_id, "stars": rng.randint(1, 5)}
+
+
+SCENARIOS = [
+    Scenario("auth.login", "POST", "/auth/login", _login, share=0.1),
+    Scenario("auth.me", "GET", "/auth/me", lambda ctx, rng: ("/auth/me", _user(ctx, rng), None)),
+
+    Scenario("posts.list", "GET", "/posts", lambda ctx, rng: ("/posts", None, None)),
+    Scenario("posts.list_filtered", "GET", "/posts", lambda ctx, rng: (
+        f"/posts?status=active&max_price={rng.randint(1000, 20000)}", None, None)),
+    Scenario("posts.search", "GET", "/posts/search", lambda ctx, rng: (
+        f"/posts/search?q={rng.choice(ITEMS).split()[0]}", None, None)),
+    Scenario("posts.nearby", "GET", "/posts/nearby", lambda ctx, rng: (
+        f"/posts/nearby?lat={CAMPUS[0] + rng.uniform(-0.05, 0.05):.4f}"
+        f"&lng={CAMPUS[1] + rng.uniform(-0.05, 0.05):.4f}&radius_km=5", None, None)),
+    Scenario("posts.suggest", "GET", "/posts/suggest", lambda ctx, rng: (
+        f"/posts/suggest?prefix={rng.choice(ITEMS)[:rng.randint(1, 4)]}", None, None)),
+    Scenario("posts.get", "GET", "/posts/{post_id}", lambda ctx, rng: (
+        f"/posts/{rng.choice(ctx.posts)[0]}", None, None)),
+    Scenario("posts.create", "POST", "/posts", lambda ctx, rng: (
+        "/posts", _user(ctx, rng), {"title": _title(rng), "price_cents": rng.randint(100, 50000)})),
+
+    Scenario("chat.open", "POST", "/chat/conversations", _open_conversation),
+    Scenario("chat.open_same_thread", "POST", "/chat/conversations", _open_hot_conversation, check=_one_thread),
+    Scenario("chat.inbox", "GET", "/chat/conversations", lambda ctx, rng: (
+        "/chat/conversations", _conversation(ctx, rng)[1], None)),
+    Scenario("chat.unread", "GET", "/chat/unread", lambda ctx, rng: (
+        "/chat/unread", _conversation(ctx, rng)[1], None)),
+    Scenario("chat.messages", "GET", "/chat/conversations/{conversation_id}/messages", _messages),
+    Scenario("chat.send", "POST", "/chat/conversations/{conversation_id}/messages", _send),
+    Scenario("chat.read", "POST", "/chat/conversations/{conversation_id}/read", _read),
+    Scenario("chat.read_many", "POST", "/chat/read", _read_many),
+
+    Scenario("transactions.create", "POST", "/transactions", _transaction),
+    Scenario("ratings.create", "POST", "/ratings", _rating),
+]
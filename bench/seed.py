@@ -0,0 +1,177 @@
+"""Deterministic bulk seed for the benchmark database.
+
+Everything is generated from one random.Random(seed), so two runs with the
+same --seed/--scale produce identical rows and ids. Rows go in through Core
+executemany in chunks; the denormalized chat counters are rebuilt at the end
+the same way `python -m app.services.chat_counters` does.
+"""
+import random
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import insert, text
+
+from app.core.db import Base, engine
+from app.core.security import hash_password
+from app.models.conversation import Conversation
+from app.models.message import Message
+from app.models.post import Post
+from app.models.rating import Rating
+from app.models.transaction import Transaction
+from app.models.user import User
+from app.services.chat_counters import REBUILD_SQL
+from app.services.reputation import REBUILD_SQL as REPUTATION_REBUILD_SQL
+from app.services.geo import grid_cell
+
+BENCH_PASSWORD = "bench-password"
+CHUNK = 5000
+
+# per unit of --scale
+USERS = 1000
+POSTS = 10000
+CONVERSATIONS = 2500
+MESSAGES_PER_CONVERSATION = 40
+TRANSACTIONS = 1000
+
+CAMPUS = (44.7975, -91.5000)
+ITEMS = [
+    "desk", "lamp", "mini fridge", "textbook", "bike", "calculator", "monitor",
+    "chair", "futon", "rug", "microwave", "headphones", "guitar", "skis",
+]
+ADJECTIVES = ["used", "like new", "cheap", "vintage", "barely used", "large", "small", "blue"]
+WORDS = "hey is this still available can you do less when could i pick it up thanks sounds good".split()
+
+
+@dataclass
+class Seeded:
+    users: int
+    posts: list[tuple[int, int]] = field(default_factory=list)            # (post_id, seller_id)
+    conversations: list[tuple[int, int, int]] = field(default_factory=list)  # (conv_id, buyer_id, seller_id)
+    transactions: list[tuple[int, int]] = field(default_factory=list)     # (tx_id, buyer_id)
+    unrated: list[tuple[int, int]] = field(default_factory=list)          # (tx_id, rater_id) free to rate
+    for_sale: list[tuple[int, int]] = field(default_factory=list)         # (post_id, seller_id) active, never bought
+
+
+def _title(rng: random.Random) -> str:
+    return f"{rng.choice(ADJECTIVES)} {rng.choice(ITEMS)}"
+
+
+async def _insert(conn, table, rows: list[dict]):
+    for i in range(0, len(rows), CHUNK):
+        await conn.execute(insert(table), rows[i:i + CHUNK])
+
+
+async def seed(scale: float = 1.0, seed: int = 42) -> Seeded:
+    rng = random.Random(seed)
+    now = datetime(2026, 3, 1, tzinfo=timezone.utc)
+    n_users = max(int(USERS * scale), 10)
+    out = Seeded(users=n_users)
+
+    # every seeded user shares one hash; login benchmarks pay bcrypt once per request
+    pw_hash = hash_password(BENCH_PASSWORD)
+
+    async with engine.begin() as conn:
+        # rebuilt from the models every run, so the schema always matches the code under test
+        # (the whole schema: drop_all misses tables another checkout created)
+        await conn.execute(text("DROP SCHEMA public CASCADE"))
+        await conn.execute(text("CREATE SCHEMA public"))
+        await conn.run_sync(Base.metadata.create_all)
+
+        await _insert(conn, User.__table__, [
+            {
+                "email": f"bench{i}@example.edu",
+                "name": f"Bench User {i}",
+                "password_hash": pw_hash,
+                "campus_lat": CAMPUS[0],
+                "campus_lng": CAMPUS[1],
+                "default_radius_km": 10.0,
+            }
+            for i in range(1, n_users + 1)
+        ])
+
+        posts = []
+        for i in range(1, int(POSTS * scale) + 1):
+            lat = CAMPUS[0] + rng.gauss(0, 0.05)
+            lng = CAMPUS[1] + rng.gauss(0, 0.05)
+            seller_id = rng.randint(1, n_users)
+            posts.append({
+                "seller_id": seller_id,
+                "title": _title(rng),
+                "description": " ".join(rng.choices(WORDS, k=12)),
+                "price_cents": rng.randint(100, 50000),
+                "status": "sold" if rng.random() < 0.2 else "active",
+                "lat": lat,
+                "lng": lng,
+                "geo_cell": grid_cell(lat, lng),
+                "created_at": now - timedelta(minutes=rng.randint(0, 60 * 24 * 90)),
+            })
+            out.posts.append((i, seller_id))
+        await _insert(conn, Post.__table__, posts)
+
+        convs, seen = [], set()
+        while len(convs) < int(CONVERSATIONS * scale):
+            post_id, seller_id = rng.choice(out.posts)
+            buyer_id = rng.randint(1, n_users)
+            if buyer_id == seller_id or (post_id, buyer_id) in seen:
+                continue
+            seen.add((post_id, buyer_id))
+            convs.append({"post_id": post_id, "buyer_id": buyer_id, "seller_id": seller_id})
+            out.conversations.append((len(convs), buyer_id, seller_id))
+        await _insert(conn, Conversation.__table__, convs)
+
+        messages = []
+        for conv_id, buyer_id, seller_id in out.conversations:
+            t = now - timedelta(days=rng.randint(1, 60))
+            for _ in range(rng.randint(1, 2 * MESSAGES_PER_CONVERSATION)):
+                t += timedelta(minutes=rng.randint(1, 600))
+                messages.append({
+                    "conversation_id": conv_id,
+                    "sender_id": rng.choice((buyer_id, seller_id)),
+                    "body": " ".join(rng.choices(WORDS, k=rng.randint(2, 20))),
+                    "created_at": t,
+                })
+            if len(messages) >= CHUNK:
+                await _insert(conn, Message.__table__, messages)
+                messages = []
+        await _insert(conn, Message.__table__, messages)
+
+        txs = []
+        for i in range(1, int(TRANSACTIONS * scale) + 1):
+            post_id, seller_id = rng.choice(out.posts)
+            buyer_id = rng.randint(1, n_users)
+            if buyer_id == seller_id:
+                buyer_id = buyer_id % n_users + 1
+            txs.append({"post_id": post_id, "buyer_id": buyer_id, "seller_id": seller_id, "status": "completed"})
+            out.transactions.append((i, buyer_id))
+        await _insert(conn, Transaction.__table__, txs)
+        bought = {tx["post_id"] for tx in txs}
+        out.for_sale = [(i, p["seller_id"]) for i, p in enumerate(posts, 1)
+                        if p["status"] == "active" and i not in bought]
+        rng.shuffle(out.for_sale)
+
+        # the first half are rated by their buyers below; every seller side is open
+        rated = len(out.transactions) // 2
+        out.unrated = [(tx_id, txs[tx_id - 1]["seller_id"]) for tx_id, _ in out.transactions]
+        out.unrated += out.transactions[rated:]
+        rng.shuffle(out.unrated)
+
+        await _insert(conn, Rating.__table__, [
+            {
+                "transaction_id": tx_id,
+                "rater_id": buyer_id,
+                "ratee_id": txs[tx_id - 1]["seller_id"],
+                "stars": rng.randint(1, 5),
+                "comment": None,
+            }
+            for tx_id, buyer_id in out.transactions[:rated]
+        ])
+
+        for sql in REBUILD_SQL + REPUTATION_REBUILD_SQL:
+            await conn.execute(text(sql))
+
+    # fresh planner statistics, outside the seeding transaction
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(text("ANALYZE"))
+
+    return out
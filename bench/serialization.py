@@ -0,0 +1,88 @@
+"""CPU time per 1,000 rows for list responses: ORM objects + Pydantic models
+(validated once by the route and again by FastAPI's response_model) vs the
+projected-columns + app.core.fastjson path the list routes use.
+
+    BENCH_DATABASE_URL=... python -m bench.serialization --rows 1000 --repeat 20
+
+Both sides run the same query shape against the bench seed; CPU time is
+process time, so waiting on Postgres doesn't count.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+
+async def main(args):
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ.setdefault("DB_ECHO", "false")
+
+    from pydantic import TypeAdapter
+    from sqlalchemy import desc, select
+
+    from app.core.db import SessionLocal
+    from app.core.fastjson import dumps, orjson
+    from app.models.message import Message
+    from app.models.post import Post
+    from app.routers.posts import _post_dicts, _select_post_rows
+    from app.schemas.chat import MessageOut
+    from app.schemas.post import PostOut, PostPage
+    from bench.seed import seed
+
+    await seed(args.scale, args.seed)
+
+    post_page = TypeAdapter(PostPage)
+    messages_out = TypeAdapter(list[MessageOut])
+    newest_posts = (desc(Post.created_at), desc(Post.id))
+    message_cols = (Message.id, Message.conversation_id, Message.sender_id, Message.body, Message.created_at)
+
+    async def posts_models(db):
+        rows = (await db.execute(select(Post).order_by(*newest_posts).limit(args.rows))).scalars().all()
+        page = PostPage(items=[PostOut.model_validate(p) for p in rows])
+        return post_page.dump_json(post_page.validate_python(page, from_attributes=True)), len(rows)
+
+    async def posts_fast(db):
+        rows = (await db.execute(_select_post_rows().order_by(*newest_posts).limit(args.rows))).all()
+        return dumps({"items": _post_dicts(rows), "next_cursor": None}), len(rows)
+
+    async def messages_models(db):
+        rows = (await db.execute(select(Message).order_by(desc(Message.id)).limit(args.rows))).scalars().all()
+        out = [MessageOut.model_validate(m) for m in rows]
+        return messages_out.dump_json(messages_out.validate_python(out, from_attributes=True)), len(rows)
+
+    async def messages_fast(db):
+        rows = (await db.execute(select(*message_cols).order_by(desc(Message.id)).limit(args.rows))).all()
+        return dumps([r._asdict() for r in rows]), len(rows)
+
+    print(f"encoder: {'orjson' if orjson else 'json (stdlib)'}; {args.rows} rows x {args.repeat} runs")
+    print(f"{'list':<12}{'path':<22}{'cpu ms / 1k rows':>18}")
+    for name, slow, fast in (("posts", posts_models, posts_fast), ("messages", messages_models, messages_fast)):
+        per_k = {}
+        for label, fn in (("pydantic models", slow), ("projected + fastjson", fast)):
+            async with SessionLocal() as db:
+                await fn(db)  # warm up statement caches
+                cpu = rows = 0
+                for _ in range(args.repeat):
+                    db.expunge_all()
+                    start = time.process_time()
+                    _, n = await fn(db)
+                    cpu += time.process_time() - start
+                    rows += n
+            per_k[label] = cpu / rows * 1000 * 1000
+            print(f"{name:<12}{label:<22}{per_k[label]:>18.2f}")
+        slow_ms, fast_ms = per_k.values()
+        print(f"{'':<12}{'speedup':<22}{slow_ms / fast_ms:>17.1f}x")
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(prog="python -m bench.serialization")
+    p.add_argument("--database-url", default=os.getenv("BENCH_DATABASE_URL"))
+    p.add_argument("--scale", type=float, default=0.2)
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--rows", type=int, default=1000)
+    p.add_argument("--repeat", type=int, default=20)
+    args = p.parse_args()
+    if not args.database_url:
+        sys.exit("set BENCH_DATABASE_URL or pass --database-url (the database is wiped on every run)")
+    asyncio.run(main(args))
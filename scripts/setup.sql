@@ -34,13 +34,25 @@ CREATE TABLE IF NOT EXISTS posts (
   -- Item location (for radius searching)
   lat          DOUBLE PRECISION,
   lng          DOUBLE PRECISION,
+  -- 0.05 degree grid cell of (lat, lng), see app/services/geo.py grid_cell()
+  geo_cell     BIGINT,
+
+  -- full-text search document (title ranks above description)
+  search_vector TSVECTOR GENERATED ALWAYS AS (
+    setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+    setweight(to_tsvector('english', coalesce(description, '')), 'B')
+  ) STORED,
 
   -- active | archived | sold
   status       TEXT NOT NULL DEFAULT 'active'
                CHECK (status IN ('active', 'archived', 'sold')),
 
   created_at   TIMESTAMPTZ NOT NULL DEFAULT now(),
-  updated_at   TIMESTAMPTZ NOT NULL DEFAULT now()
+  updated_at   TIMESTAMPTZ NOT NULL DEFAULT now(),
+  -- bumped on every update; the ORM checks it against lost updates
+  version      INTEGER NOT NULL DEFAULT 1,
+  -- id of the last writing transaction (trg_posts_change_seq); GET /posts/changes
+  change_seq   BIGINT NOT NULL DEFAULT pg_current_xact_id()::text::bigint
 );
 
 -- updated_at trigger (simple + hackathon-safe)
@@ -58,6 +70,16 @@ BEFORE UPDATE ON posts
 FOR EACH ROW
 EXECUTE FUNCTION set_updated_at();
 
+-- change feed: stamp every insert/update, keep a tombstone for every delete
+CREATE TABLE IF NOT EXISTS post_tombstones (
+  post_id     BIGINT PRIMARY KEY,
+  change_seq  BIGINT NOT NULL,
+  deleted_at  TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+-- the triggers that fill change_seq and post_tombstones are installed by the
+-- app at startup (POST_CHANGE_DDL in app/models/post.py)
+
 -- =========================
 -- TRANSACTIONS (purchase/handoff)
 -- =========================
@@ -81,11 +103,11 @@ CREATE TABLE IF NOT EXISTS transactions (
 CREATE UNIQUE INDEX IF NOT EXISTS ux_transactions_post_id ON transactions(post_id);
 
 -- =========================
--- RATINGS (one per completed transaction)
+-- RATINGS (one per side of a completed transaction)
 -- =========================
 CREATE TABLE IF NOT EXISTS ratings (
   id              BIGSERIAL PRIMARY KEY,
-  transaction_id  BIGINT NOT NULL UNIQUE REFERENCES transactions(id) ON DELETE CASCADE,
+  transaction_id  BIGINT NOT NULL REFERENCES transactions(id) ON DELETE CASCADE,
 
   rater_id        BIGINT NOT NULL REFERENCES users(id) ON DELETE CASCADE,
   ratee_id        BIGINT NOT NULL REFERENCES users(id) ON DELETE CASCADE,
@@ -95,16 +117,67 @@ CREATE TABLE IF NOT EXISTS ratings (
 
   created_at      TIMESTAMPTZ NOT NULL DEFAULT now(),
 
-  CONSTRAINT rater_not_ratee CHECK (rater_id <> ratee_id)
+  CONSTRAINT rater_not_ratee CHECK (rater_id <> ratee_id),
+  CONSTRAINT uq_ratings_transaction_rater UNIQUE (transaction_id, rater_id)
+);
+
+-- =========================
+-- USER REPUTATIONS (aggregate of ratings per ratee, see app/services/reputation.py)
+-- =========================
+CREATE TABLE IF NOT EXISTS user_reputations (
+  user_id       BIGINT PRIMARY KEY REFERENCES users(id) ON DELETE CASCADE,
+  rating_count  INTEGER NOT NULL DEFAULT 0,
+  star_sum      INTEGER NOT NULL DEFAULT 0,
+  stars_1       INTEGER NOT NULL DEFAULT 0,
+  stars_2       INTEGER NOT NULL DEFAULT 0,
+  stars_3       INTEGER NOT NULL DEFAULT 0,
+  stars_4       INTEGER NOT NULL DEFAULT 0,
+  stars_5       INTEGER NOT NULL DEFAULT 0,
+  last_rated_at TIMESTAMPTZ
+);
+
+-- =========================
+-- SAVED SEARCHES + NOTIFICATIONS (new-listing alerts, see app/services/saved_searches.py)
+-- =========================
+CREATE TABLE IF NOT EXISTS saved_searches (
+  id               BIGSERIAL PRIMARY KEY,
+  user_id          BIGINT NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+  name             TEXT,
+
+  -- every predicate is optional; all given must match
+  keywords         TEXT,
+  min_price_cents  INTEGER,
+  max_price_cents  INTEGER,
+  lat              DOUBLE PRECISION,
+  lng              DOUBLE PRECISION,
+  radius_km        DOUBLE PRECISION,
+
+  created_at       TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE TABLE IF NOT EXISTS notifications (
+  id               BIGSERIAL PRIMARY KEY,
+  user_id          BIGINT NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+  saved_search_id  BIGINT NOT NULL REFERENCES saved_searches(id) ON DELETE CASCADE,
+  post_id          BIGINT NOT NULL REFERENCES posts(id) ON DELETE CASCADE,
+  created_at       TIMESTAMPTZ NOT NULL DEFAULT now(),
+  read_at          TIMESTAMPTZ,
+  UNIQUE (saved_search_id, post_id)
 );
 
 -- =========================
 -- INDEXES (basic performance)
 -- =========================
-CREATE INDEX IF NOT EXISTS idx_posts_seller_id   ON posts(seller_id);
-CREATE INDEX IF NOT EXISTS idx_posts_status      ON posts(status);
 CREATE INDEX IF NOT EXISTS idx_posts_category    ON posts(category);
-CREATE INDEX IF NOT EXISTS idx_posts_created_at  ON posts(created_at DESC);
+
+-- feed pagination walks (created_at DESC, id DESC), optionally within a status or seller
+CREATE INDEX IF NOT EXISTS ix_posts_created_id        ON posts(created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS ix_posts_status_created_id ON posts(status, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS ix_posts_seller_created_id ON posts(seller_id, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS ix_posts_geo_cell          ON posts(geo_cell);
+CREATE INDEX IF NOT EXISTS ix_posts_search_vector     ON posts USING GIN (search_vector);
+CREATE INDEX IF NOT EXISTS ix_posts_change_seq_id     ON posts(change_seq, id);
+CREATE INDEX IF NOT EXISTS ix_post_tombstones_change_seq_id ON post_tombstones(change_seq, post_id);
 
 CREATE INDEX IF NOT EXISTS idx_transactions_buyer_id  ON transactions(buyer_id);
 CREATE INDEX IF NOT EXISTS idx_transactions_seller_id ON transactions(seller_id);
@@ -112,3 +185,7 @@ CREATE INDEX IF NOT EXISTS idx_transactions_status    ON transactions(status);
 
 CREATE INDEX IF NOT EXISTS idx_ratings_ratee_id  ON ratings(ratee_id);
 CREATE INDEX IF NOT EXISTS idx_ratings_rater_id  ON ratings(rater_id);
+
+CREATE INDEX IF NOT EXISTS ix_saved_searches_user       ON saved_searches(user_id);
+CREATE INDEX IF NOT EXISTS ix_notifications_user_id     ON notifications(user_id, id DESC);
+CREATE INDEX IF NOT EXISTS ix_notifications_user_unread ON notifications(user_id) WHERE read_at IS NULL;